@@ -1,12 +1,27 @@
 from __future__ import annotations
 import time
 import os
+import shlex
 import click
 from .constants import DEFAULT_MODEL, DEFAULT_TIMEOUT, DEFAULT_MAX_DEPTH, DEFAULT_CONCURRENCY, DEFAULT_TEMPERATURE, DEFAULT_PROVIDER
 from .discovery import build_tree
 from .serialize import to_json, write_json
 from .wdl import emit_wdl
 from .json_review import review_json_interactive, llm_double_check as perform_llm_double_check
+from .parsing.cache import LLMResponseCache, ParseCache
+from langchain_core.globals import set_llm_cache
+
+def _has_output_param(doc) -> bool:
+    """
+    Check whether a command declares any output file parameter.
+
+    :param doc: Command or tool documentation object
+    :type doc: CommandDoc | ToolDoc
+    :return: True if any option or positional has file_role "output"
+    :rtype: bool
+    """
+    return any(opt.file_role == "output" for opt in doc.options) or \
+        any(pos.file_role == "output" for pos in doc.positionals)
 
 @click.command()
 @click.option("--command", required=True, help="Root command to inspect, e.g. samtools")
@@ -22,12 +37,13 @@ from .json_review import review_json_interactive, llm_double_check as perform_ll
 @click.option("--help-flags", default="--help -h", show_default=True, help="Help flags to try in order")
 @click.option("--workdir", type=click.Path(file_okay=False, exists=True), help="Working directory")
 @click.option("--env", multiple=True, help="Extra env vars: KEY=VAL", metavar="KEY=VAL")
-@click.option("--no-llm-cache", is_flag=True, default=False, help="Disable on-disk LLM parse cache")
+@click.option("--no-llm-cache", is_flag=True, default=False, help="Disable on-disk LLM parse and response caches")
 @click.option("--review-subcommands", is_flag=True, default=False, help="Enable interactive review of discovered subcommands")
 @click.option("--review-json", is_flag=True, default=False, help="Enable interactive review of JSON output before saving")
 @click.option("--no-llm-double-check", is_flag=True, default=False, help="Disable automatic LLM verification of parsed JSON")
 @click.option("--piped", is_flag=True, default=False, help="Enable piped output support for all output parameters with auto-generated filenames")
-def main(command, model, provider, temperature, google_api_key, output, wdl_out, timeout, max_depth, concurrency, help_flags, workdir, env, no_llm_cache, review_subcommands, review_json, no_llm_double_check, piped):
+@click.option("--template-parse", is_flag=True, default=False, help="Parse argparse/click generated help without the LLM")
+def main(command, model, provider, temperature, google_api_key, output, wdl_out, timeout, max_depth, concurrency, help_flags, workdir, env, no_llm_cache, review_subcommands, review_json, no_llm_double_check, piped, template_parse):
     """
     Parse CLI help text using LLM and emit structured documentation.
 
@@ -61,7 +77,7 @@ def main(command, model, provider, temperature, google_api_key, output, wdl_out,
     :type workdir: str | None
     :param env: Tuple of KEY=VAL environment variable strings
     :type env: tuple[str, ...]
-    :param no_llm_cache: Whether to disable LLM parse cache
+    :param no_llm_cache: Whether to disable LLM parse and response caches
     :type no_llm_cache: bool
     :param review_subcommands: Whether to enable interactive review of subcommands
     :type review_subcommands: bool
@@ -71,6 +87,8 @@ def main(command, model, provider, temperature, google_api_key, output, wdl_out,
     :type no_llm_double_check: bool
     :param piped: Whether to enable piped output support for all output parameters
     :type piped: bool
+    :param template_parse: Whether to parse argparse/click generated help without the LLM
+    :type template_parse: bool
     :return: None
     :rtype: None
     """
@@ -91,12 +109,12 @@ def main(command, model, provider, temperature, google_api_key, output, wdl_out,
     click.echo(f"Using model: {model}")
     click.echo(f"Temperature: {temperature}")
     click.echo(f"Max depth: {max_depth}, Concurrency: {concurrency}")
-    env_map = {}
-    for kv in env:
-        if "=" in kv:
-            k, v = kv.split("=", 1)
-            env_map[k] = v
-    flags = tuple(x for x in help_flags.split() if x)
+    env_map = dict(kv.split("=", 1) for kv in env if "=" in kv)
+    flags = tuple(shlex.split(help_flags))
+
+    # Share one persistent response cache across every LLM call in this run
+    if not no_llm_cache:
+        set_llm_cache(LLMResponseCache())
 
     click.echo(f"Building command tree...")
     result, all_docs = build_tree(
@@ -113,6 +131,7 @@ def main(command, model, provider, temperature, google_api_key, output, wdl_out,
         concurrency=concurrency,
         use_cache=not no_llm_cache,
         review_subcommands=review_subcommands,
+        template_parse=template_parse,
     )
 
     click.echo(f"\nFound {len(all_docs)} total commands (including root)")
@@ -128,45 +147,39 @@ def main(command, model, provider, temperature, google_api_key, output, wdl_out,
         click.echo(f"\nEnabling piped output for commands with output parameters...")
         
         # Apply to all_docs
+        enabled = []
         for doc in all_docs:
-            has_output = any(opt.file_role == "output" for opt in doc.options) or \
-                        any(pos.file_role == "output" for pos in doc.positionals)
-            if has_output:
+            if _has_output_param(doc):
                 doc.supports_piped_output = True
-                click.echo(f"  - Enabled piped output for {doc.path}")
+                enabled.append(f"  - Enabled piped output for {doc.path}")
+        if enabled:
+            click.echo("\n".join(enabled))
         
-        # Also update the result.tool
-        has_output = any(opt.file_role == "output" for opt in result.tool.options) or \
-                    any(pos.file_role == "output" for pos in result.tool.positionals)
-        if has_output:
+        # Also update the result.tool and its subcommands
+        if _has_output_param(result.tool):
             result.tool.supports_piped_output = True
-        
-        # Update subcommands in result.tool
         for subcmd in result.tool.subcommands:
-            has_output = any(opt.file_role == "output" for opt in subcmd.options) or \
-                        any(pos.file_role == "output" for pos in subcmd.positionals)
-            if has_output:
+            if _has_output_param(subcmd):
                 subcmd.supports_piped_output = True
     
     # Apply LLM double-check by default (unless disabled)
     if not no_llm_double_check:
-        result = perform_llm_double_check(result, model, provider, temperature, google_api_key, all_docs)
+        result = perform_llm_double_check(result, model, provider, temperature, google_api_key, all_docs, cache=None if no_llm_cache else ParseCache())
     
     # Apply interactive review if requested
     if review_json:
         result = review_json_interactive(result, model, provider, temperature, google_api_key, all_docs)
     
     # Set default output filenames if not provided
-    version = result.tool.version or "unknown"
-    if not output:
-        output = f"{command}_{version}.json"
-    if not wdl_out:
-        wdl_out = f"{command}_{version}.wdl"
+    if not output or not wdl_out:
+        version = result.tool.version or "unknown"
+        output = output or f"{command}_{version}.json"
+        wdl_out = wdl_out or f"{command}_{version}.wdl"
     
     click.echo(f"\nWriting JSON output to: {output}")
     write_json(output, result)
     click.echo(f"Generating WDL tasks to: {wdl_out}")
-    emit_wdl(tool_name=command, docs=all_docs, out_path=wdl_out, model_name=model, provider=provider, temperature=temperature, google_api_key=google_api_key, container_info=result.tool.container_info)
+    emit_wdl(tool_name=command, docs=all_docs, out_path=wdl_out, model_name=model, provider=provider, temperature=temperature, google_api_key=google_api_key, container_info=result.tool.container_info, concurrency=concurrency)
     
     elapsed_time = time.time() - start_time
     click.echo(f"\nTotal execution time: {elapsed_time:.2f} seconds")
@@ -2,8 +2,16 @@ HELP_FLAG_CANDIDATES: tuple[str, ...] = ("--help", "-h")
 VERSION_FLAG_CANDIDATES: tuple[str, ...] = ("--version", "-v")
 SCHEMA_VERSION = "1.0"
 DEFAULT_TIMEOUT = 30
+HELP_IDLE_TIMEOUT = 0.5
 DEFAULT_MAX_DEPTH = 1
 DEFAULT_CONCURRENCY = 1
 DEFAULT_MODEL = "gemma3:12b"
 DEFAULT_TEMPERATURE = 0.0
 DEFAULT_PROVIDER = "ollama"
+DEFAULT_KEEP_ALIVE = "60m"
+DEFAULT_NUM_CTX = 8192
+DEFAULT_PARSE_BATCH_SIZE = 8
+MIN_HELP_TEXT_CHARS = 32
+DEFAULT_BATCH_TOKEN_BUDGET = 4096
+ESTIMATE_HELP_HEAD_CHARS = 1500
+ESTIMATE_HELP_TAIL_CHARS = 500
@@ -1,31 +1,96 @@
+import hashlib, os, time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .utils import write_atomic
+from .serialize import dumps_bytes, loads_bytes
+
+def _make_session() -> requests.Session:
+    """
+    Create a pooled HTTP session for the BioContainers API.
+
+    Connections are kept alive between lookups, and transient failures
+    (429/5xx) are retried with backoff, honoring any Retry-After header.
+    """
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504), allowed_methods=("GET",), respect_retry_after_header=True, raise_on_status=False)
+    session.mount("https://", HTTPAdapter(max_retries=retry))
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+_SESSION = _make_session()
+_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+# BioContainers image_type (lowercased) -> ContainerInfo field
+_IMAGE_TYPE_KEYS = {"conda": "bioconda", "docker": "docker", "singularity": "singularity"}
+
+def _cache_path(executable: str, version: str, cache_dir: str | None) -> str:
+    """Return the on-disk cache file for a (tool, version) lookup."""
+    root = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "cmdsaw", "biocontainers")
+    h = hashlib.sha256(f"{executable}|{version}".encode()).hexdigest()[:32]
+    return os.path.join(root, f"{h}.json")
+
+def _read_cache_entry(path: str) -> tuple[dict, float] | None:
+    """
+    Read a cached lookup, treating a missing, truncated or malformed file as a miss.
+
+    :param path: Cache file path
+    :type path: str
+    :return: Tuple of (entry with "etag" and "result" keys, file mtime), or None
+    :rtype: tuple[dict, float] | None
+    """
+    try:
+        with open(path, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+            cached = loads_bytes(f.read())
+        cached["result"]
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError):  # json/orjson decode errors or wrong shape
+        print(f"Warning: ignoring corrupt cache entry {path}")
+        return None
+    return cached, mtime
+
+def request_biocontainers(executable: str, version: str, use_cache: bool = True, cache_dir: str | None = None) -> dict:
+    """
+    Make request to BioContainers given an executable (tool name) and version.
+
+    Successful lookups are cached on disk for a week, since published images
+    for a tool version rarely change; errors are never cached. Entries are
+    written atomically, and an unreadable entry counts as a miss. Once an entry
+    expires it is revalidated with its ETag, so an unchanged response costs a
+    bodiless 304 instead of a full download.
+    """
+    path = _cache_path(executable, version, cache_dir) if use_cache else None
+    entry = _read_cache_entry(path) if path else None
+    cached = entry[0] if entry else None
+    if entry and time.time() - entry[1] < _CACHE_TTL_SECONDS:
+        print(f"Using cached BioContainers info for {executable}-{version}")
+        return cached["result"]
 
-def request_biocontainers(executable: str, version: str) -> dict:
-    """Make request to BioContainers given an executable (tool name) and version."""
     url = f"https://api.biocontainers.pro/ga4gh/trs/v2/tools/{executable}/versions/{executable}-{version}"
     # Example: https://api.biocontainers.pro/ga4gh/trs/v2/tools/samtools/versions/samtools-1.19
     print(f"Running request for {executable}-{version}")
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else None
     
     try:
-        r = requests.get(url, timeout=10)
+        r = _SESSION.get(url, timeout=10, headers=headers)
+        if r.status_code == 304 and cached:
+            # Unchanged since last fetch: refresh the entry's age and reuse it
+            os.utime(path)
+            return cached["result"]
         if r.status_code == 200:
             data = r.json()
 
-            bioconda = docker = singularity = None
-            images = data.get("images", [])
+            result = {"bioconda": None, "docker": None, "singularity": None}
+            images = data.get("images") or []
             # Loop through images and assign image name based on type
             for x in images:
-                if x.get("image_type", "").lower() == "conda":
-                    bioconda = x.get("image_name")
-                elif x.get("image_type", "").lower() == "docker":
-                    docker = x.get("image_name")
-                elif x.get("image_type", "").lower() == "singularity":
-                    singularity = x.get("image_name")
-            return {
-                "bioconda": bioconda,
-                "docker": docker,
-                "singularity": singularity
-            }
+                key = _IMAGE_TYPE_KEYS.get((x.get("image_type") or "").lower())
+                if key:
+                    result[key] = x.get("image_name")
+            if path:
+                write_atomic(path, dumps_bytes({"etag": r.headers.get("ETag"), "result": result}))
+            return result
         else:
             # In the case of a non-success HTTP status code
             return {"error": r.status_code, "message": r.text}
@@ -34,4 +99,4 @@ def request_biocontainers(executable: str, version: str) -> dict:
         return {"error": "timeout", "message": "Request timed out"}
     except Exception as e:
         # For any other exceptions
-        return {"error": "exception", "message": str(e)}
\ No newline at end of file
+        return {"error": "exception", "message": str(e)}
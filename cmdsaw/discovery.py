@@ -1,11 +1,13 @@
 from __future__ import annotations
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional, Mapping, Set, Tuple
+import asyncio, threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Optional, Mapping, Tuple
 from .parsing.schema import CommandDoc, ToolDoc, CmdSawResult, ParseDiagnostics, ContainerInfo
-from .parsing.llm_parser import parse_command_help
+from .parsing.llm_parser import parse_command_help, parse_command_help_batch, parse_command_help_with_emphasis
 from .parsing.cache import ParseCache
 from .constants import DEFAULT_TIMEOUT, DEFAULT_MAX_DEPTH, DEFAULT_CONCURRENCY, SCHEMA_VERSION
-from .runner import try_help, try_version, now_iso
+from .runner import try_help, try_help_async, try_version, now_iso
 from .utils import which_or_raise
 from .containers import request_biocontainers
 
@@ -62,7 +64,13 @@ def _review_subcommands(discovered: List[str], root_cmd: str, help_text: str = N
             print(f"\nEnter subcommands to add (comma-separated, or press Enter to cancel):")
             additions = input("> ").strip()
             if additions:
-                new_subcmds = [s.strip() for s in additions.split(',') if s.strip()]
+                seen = set(discovered)
+                new_subcmds = []
+                for s in additions.split(','):
+                    s = s.strip()
+                    if s and s not in seen:
+                        seen.add(s)
+                        new_subcmds.append(s)
                 discovered.extend(new_subcmds)
                 print(f"Added {len(new_subcmds)} subcommand(s).")
                 print(f"Current list: {', '.join(discovered)}")
@@ -78,9 +86,8 @@ def _review_subcommands(discovered: List[str], root_cmd: str, help_text: str = N
             if removals:
                 try:
                     indices = [int(x.strip()) - 1 for x in removals.split(',') if x.strip()]
-                    to_remove = [discovered[i] for i in indices if 0 <= i < len(discovered)]
-                    for subcmd in to_remove:
-                        discovered.remove(subcmd)
+                    to_remove = {discovered[i] for i in indices if 0 <= i < len(discovered)}
+                    discovered = [subcmd for subcmd in discovered if subcmd not in to_remove]
                     print(f"Removed {len(to_remove)} subcommand(s).")
                     print(f"Current list: {', '.join(discovered)}")
                 except (ValueError, IndexError) as e:
@@ -106,9 +113,6 @@ def _review_subcommands(discovered: List[str], root_cmd: str, help_text: str = N
             print(f"\nRe-parsing with LLM using emphasized prompt for subcommand discovery...")
             print(f"This will invoke the model again with special emphasis on finding ALL subcommands.")
             
-            # Import here to avoid circular dependency
-            from .parsing.llm_parser import parse_command_help_with_emphasis
-            
             try:
                 reparsed_doc = parse_command_help_with_emphasis(
                     model_name=model_name,
@@ -151,12 +155,15 @@ def build_tree(
     concurrency: int = DEFAULT_CONCURRENCY,
     use_cache: bool = True,
     review_subcommands: bool = False,
+    template_parse: bool = False,
 ) -> Tuple[CmdSawResult, List[CommandDoc]]:
     """
     Build a complete documentation tree for a command and its subcommands.
 
     Recursively discovers and parses help text for a root command and all its
-    subcommands using an LLM. Supports concurrent parsing and result caching.
+    subcommands using an LLM. Each BFS level captures help text concurrently
+    with asyncio subprocesses and is then parsed in one batched LLM call.
+    Supports result caching.
 
     :param root_cmd: Name of the root command to inspect
     :type root_cmd: str
@@ -178,12 +185,14 @@ def build_tree(
     :type cwd: Optional[str]
     :param help_flags: Tuple of help flags to try in order
     :type help_flags: tuple[str,...]
-    :param concurrency: Maximum number of parallel subcommand parses
+    :param concurrency: Maximum number of parallel help captures and LLM parses
     :type concurrency: int
-    :param use_cache: Whether to use on-disk LLM parse cache
+    :param use_cache: Whether to use on-disk LLM parse and BioContainers caches
     :type use_cache: bool
     :param review_subcommands: Whether to enable interactive review of subcommands
     :type review_subcommands: bool
+    :param template_parse: Parse argparse/click generated help without the LLM
+    :type template_parse: bool
     :return: Tuple of (complete result, list of all command docs)
     :rtype: Tuple[CmdSawResult, List[CommandDoc]]
     """
@@ -198,8 +207,12 @@ def build_tree(
     else:
         print("LLM cache disabled")
 
-    help_text, _ = try_help([bin_path], help_flags, timeout=timeout, env=env, cwd=cwd)
-    version = try_version([bin_path], timeout=timeout, env=env, cwd=cwd)
+    # Root help and version probes are independent subprocesses; overlap them
+    with ThreadPoolExecutor(max_workers=2) as boot:
+        f_help = boot.submit(try_help, [bin_path], help_flags, timeout=timeout, env=env, cwd=cwd)
+        f_ver = boot.submit(try_version, [bin_path], timeout=timeout, env=env, cwd=cwd)
+        help_text, _ = f_help.result()
+        version = f_ver.result()
     diagnostics.version_extracted = bool(version)
 
     print(f"\nParsing root command with LLM...")
@@ -212,8 +225,11 @@ def build_tree(
         help_text=help_text,
         retries=2,
         cache_getset=cache_getset,
+        template_parse=template_parse,
     )
-    visited: Set[str] = set([root_doc.path])
+    # dict.setdefault checks and marks a path in one atomic step: it only
+    # returns the caller's fresh token when the path was not there yet
+    visited: Dict[Tuple[str, ...], object] = {(): object()}
     
     # Handle subcommand review if enabled
     subcommands_to_process = list(root_doc.subcommands)
@@ -222,64 +238,132 @@ def build_tree(
     else:
         print("No subcommands discovered in root")
     
-    if review_subcommands:
-        subcommands_to_process = _review_subcommands(
-            subcommands_to_process, 
-            root_cmd,
-            help_text=help_text,
-            model_name=model_name,
-            provider=provider,
-            temperature=temperature,
-            google_api_key=google_api_key,
-            cache_getset=cache_getset
-        )
-    
-    queue: List[tuple[str,int]] = [(name, 1) for name in subcommands_to_process]
-
     subdocs: Dict[str, CommandDoc] = {}
+    depth_buckets: Dict[int, List[str]] = {}
+    # Every subcommand path starts with the same executable, so resolve it once
+    bin_cache: Dict[str, str] = {root_cmd.split()[0]: bin_path}
+
+    # Every help capture, prefetched or on demand, runs on one event loop in a
+    # background thread, so a single semaphore bounds them to `concurrency`
+    capture_loop = asyncio.new_event_loop()
+    capture_thread = threading.Thread(target=capture_loop.run_forever, name="cmdsaw-help", daemon=True)
+    capture_thread.start()
+    capture_slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def capture_help(paths: List[str]) -> List[str]:
+        async def capture_one(path: str) -> str:
+            async with capture_slots:
+                parts = path.split()
+                bin_ = bin_cache.get(parts[0]) or bin_cache.setdefault(parts[0], which_or_raise(parts[0]))
+                help_t, _ = await try_help_async([bin_] + parts[1:], help_flags, timeout=timeout, env=env, cwd=cwd)
+                return help_t
+
+        return await asyncio.gather(*(capture_one(p) for p in paths))
+
+    def run_capture(paths: List[str]) -> Future:
+        return asyncio.run_coroutine_threadsafe(capture_help(paths), capture_loop)
+
+    async def cancel_captures() -> None:
+        # Cancelled captures kill their subprocess; wait until they are reaped
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Help captures started ahead of their BFS level: (paths, future of help texts)
+    pending: List[Tuple[List[str], Future]] = []
+    prefetched: Dict[str, str] = {}
 
-    def process_one(path: str, depth: int) -> tuple[str, CommandDoc]:
-        print(f"  Processing subcommand: {path} (depth={depth})")
-        parts = path.split()
-        bin_ = which_or_raise(parts[0])
-        help_t, _ = try_help([bin_] + parts[1:], help_flags, timeout=timeout, env=env, cwd=cwd)
-        doc = parse_command_help(
-            model_name=model_name,
-            provider=provider,
-            temperature=temperature,
-            google_api_key=google_api_key,
-            command_path=path,
-            help_text=help_t,
-            retries=2,
-            cache_getset=cache_getset,
-        )
-        if doc.subcommands:
-            print(f"    Found {len(doc.subcommands)} sub-subcommand(s): {', '.join(doc.subcommands)}")
-        return path, doc
+    def prefetch_help(paths: List[str]) -> None:
+        if paths:
+            pending.append((paths, run_capture(paths)))
 
-    print(f"\nProcessing subcommands (max_depth={max_depth}, concurrency={concurrency})...")
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+    def collect_prefetched() -> None:
+        for paths, fut in pending:
+            try:
+                prefetched.update(zip(paths, fut.result()))
+            except Exception as e:
+                print(f"  Help prefetch failed, capturing on demand: {e}")
+        pending.clear()
+
+    try:
+        if review_subcommands:
+            # Capture the discovered subcommands' help in the background while the
+            # user reviews the list; entries they remove are simply never used
+            prefetch_help([f"{root_cmd} {name}" for name in subcommands_to_process])
+            subcommands_to_process = _review_subcommands(
+                subcommands_to_process, 
+                root_cmd,
+                help_text=help_text,
+                model_name=model_name,
+                provider=provider,
+                temperature=temperature,
+                google_api_key=google_api_key,
+                cache_getset=cache_getset
+            )
+    
+        # Queue entries are (subcommand parts below the root, depth); paths are only
+        # joined into display strings once per node
+        queue: deque[tuple[Tuple[str, ...], int]] = deque(((name,), 1) for name in subcommands_to_process)
+
+        def on_parsed(i: int, doc: CommandDoc) -> None:
+            # Start capturing children's help while the rest of the level is parsed
+            path, _, depth = level[i]
+            if depth < max_depth:
+                prefetch_help([f"{path} {child}" for child in doc.subcommands])
+
+        print(f"\nProcessing subcommands (max_depth={max_depth}, concurrency={concurrency})...")
         while queue:
-            futures = []
-            while queue and len(futures) < concurrency:
-                name, depth = queue.pop(0)
-                full_path = f"{root_cmd} {name}"
-                if full_path in visited or depth > max_depth:
+            # Take one BFS level at a time; children are queued for the next pass
+            level: List[Tuple[str, Tuple[str, ...], int]] = []
+            while queue:
+                parts, depth = queue.popleft()
+                token = object()
+                if depth > max_depth or visited.setdefault(parts, token) is not token:
                     continue
-                visited.add(full_path)
-                futures.append(ex.submit(process_one, full_path, depth))
-            for fut in as_completed(futures):
-                path, doc = fut.result()
+                level.append((" ".join((root_cmd,) + parts), parts, depth))
+            if not level:
+                continue
+            paths = [full_path for full_path, _, _ in level]
+            print("\n".join(f"  Processing subcommand: {p}" for p in paths))
+            collect_prefetched()
+            missing = [p for p in paths if p not in prefetched]
+            if missing:
+                prefetched.update(zip(missing, run_capture(missing).result()))
+            help_texts = [prefetched.pop(p) for p in paths]
+            docs = parse_command_help_batch(
+                model_name=model_name,
+                provider=provider,
+                temperature=temperature,
+                google_api_key=google_api_key,
+                items=list(zip(paths, help_texts)),
+                retries=2,
+                cache_getset=cache_getset,
+                concurrency=concurrency,
+                on_parsed=on_parsed,
+                template_parse=template_parse,
+            )
+            for (path, parts, depth), doc in zip(level, docs):
+                if doc.subcommands:
+                    print(f"    Found {len(doc.subcommands)} sub-subcommand(s) in {path}: {', '.join(doc.subcommands)}")
                 subdocs[path] = doc
+                depth_buckets.setdefault(depth, []).append(path)
                 diagnostics.visited_commands += 1
                 for child in doc.subcommands:
-                    queue.append((f"{path} {child}", path.count(" ") + 1))
+                    queue.append((parts + (child,), depth + 1))
+    finally:
+        asyncio.run_coroutine_threadsafe(cancel_captures(), capture_loop).result()
+        capture_loop.call_soon_threadsafe(capture_loop.stop)
+        capture_thread.join()
+        capture_loop.close()
+    if cache:
+        cache.flush()
 
     # Fetch container information if version is available
     container_info = None
     if version:
         print(f"\nFetching container info for {root_cmd} version {version}...")
-        container_data = request_biocontainers(root_cmd, version)
+        container_data = request_biocontainers(root_cmd, version, use_cache=use_cache)
         if "error" not in container_data:
             container_info = ContainerInfo(**container_data)
             print(f"  Found container info: docker={container_info.docker}, singularity={container_info.singularity}, bioconda={container_info.bioconda}")
@@ -293,7 +377,7 @@ def build_tree(
         invocation=[bin_path],
         options=root_doc.options,
         positionals=root_doc.positionals,
-        subcommands=[subdocs[k] for k in sorted(subdocs.keys()) if k.count(" ")==1],
+        subcommands=[subdocs[k] for k in sorted(depth_buckets.get(1, []))],
         captured_at=now_iso(),
         container_info=container_info,
     )
@@ -1,11 +1,227 @@
 from __future__ import annotations
-import json
+import asyncio, re
 import click
-from typing import Optional, Union, List, Dict, Any
-from .parsing.schema import CmdSawResult, CommandDoc
-from langchain_ollama import ChatOllama
-from langchain_google_genai import ChatGoogleGenerativeAI
+from itertools import islice
+from typing import Optional, Union, List, Dict, Any, Iterator
+from .parsing.schema import CmdSawPatch, CmdSawPatchSet, CmdSawResult, CommandDoc, CommandDocBatch
+from .parsing.cache import ParseCache, normalize_help_text
+from .parsing.llm_parser import _structured_model
+from .serialize import to_json
 
+_FIX_SYSTEM_PROMPT = """You are a JSON correction assistant. The user has identified issues with a parsed CLI command structure.
+Your task is to fix these specific issues while preserving all other correct information.
+
+Rules:
+- Fix ONLY the issues described by the user
+- Preserve all other data exactly as it was
+- Return a complete, valid CmdSawResult JSON object
+- Do not add or remove information that wasn't mentioned in the issues
+"""
+
+_PATCH_SYSTEM_PROMPT = """You are a JSON correction assistant. The user has identified issues with a parsed CLI command structure.
+Your task is to return ONLY the edits needed to fix these specific issues.
+
+Rules:
+- Return a list of patches; each patch has a "path" and a "new_value"
+- "path" is a dotted path with list indices, e.g. "tool.options[3].description" or "tool.subcommands[0].positionals[1].type"
+- "new_value" is the complete replacement value at that path
+- Use an index equal to the list length to append a new item
+- Do not touch anything that wasn't mentioned in the issues
+- Return an empty list if the fix cannot be expressed as patches
+"""
+
+_DOUBLECHECK_SYSTEM_PROMPT = """You are a quality assurance assistant for CLI command parsing.
+Your task is to verify and correct parsed CLI command nodes against their original help text.
+
+Verification checklist:
+1. Are all options and flags from the help text included?
+2. Are parameter types correct (int, float, str, path, bool, choice)?
+3. Are required vs optional parameters correctly identified?
+4. Are default values captured?
+5. Are positional arguments in the correct order?
+6. Are subcommands correctly listed?
+7. Are descriptions clear and accurate?
+
+Rules:
+- Compare each command node's JSON against the help text for the same command path
+- Fix any missing or incorrect information
+- Add missing parameters that were in the help text
+- Correct parameter types if they are wrong
+- Ensure all subcommands from help text are listed
+- Preserve correct information
+- Keep every node's `path` and `name` unchanged
+- Return every node you were given in `docs`, one object per node
+"""
+
+_PATCH_TOKEN_RE = re.compile(r"([^.\[\]]+)|\[(\d+)\]")
+# Usage line and option/argument/command/flag sections (headings such as
+# "Options (defaults in parentheses):" included), up to the next unindented line
+_SALIENT_RE = re.compile(r"^(?:usage\b|[^\n:]*\b(?:options|arguments|commands|subcommands|flags)\b[^\n]*:[ \t]*$).*?(?=^\S|\Z)", re.M | re.S | re.I)
+# Below this share of the help text, extraction likely missed unlabeled option lists
+_SALIENT_MIN_FRACTION = 0.5
+
+
+def _apply_patches(result: CmdSawResult, patches: List[CmdSawPatch]) -> CmdSawResult:
+    """
+    Apply path-addressed patches to a copy of the result.
+
+    An index equal to a list's length appends to it; any other unknown key
+    or index raises so the caller can fall back to full regeneration.
+
+    :param result: Result to patch
+    :type result: CmdSawResult
+    :param patches: Patches to apply in order
+    :type patches: List[CmdSawPatch]
+    :return: Patched and re-validated result
+    :rtype: CmdSawResult
+    """
+    data = result.model_dump(mode="json")
+    for patch in patches:
+        keys = [int(index) if index else name for name, index in _PATCH_TOKEN_RE.findall(patch.path)]
+        if not keys:
+            raise ValueError(f"Empty patch path: {patch.path!r}")
+        target: Any = data
+        for key in keys[:-1]:
+            target = target[key]
+        last = keys[-1]
+        if isinstance(target, list) and last == len(target):
+            target.append(patch.new_value)
+        elif isinstance(target, dict) and last not in target:
+            raise KeyError(f"Unknown field in patch path: {patch.path!r}")
+        else:
+            target[last] = patch.new_value
+    return CmdSawResult.model_validate(data)
+
+def _extract_salient_sections(help_text: str) -> str:
+    """
+    Keep only the usage and option/argument/command sections of help text.
+
+    Banners, prose descriptions and epilogs carry nothing the double-check
+    can verify, but they make up much of the prompt. Many tools (GNU
+    coreutils, for one) list options without a heading, so whenever the
+    sections found cover less than ``_SALIENT_MIN_FRACTION`` of the text the
+    help is returned unchanged rather than risk hiding options from the
+    double-check, which would then drop them from the JSON.
+
+    :param help_text: Help text (already normalized)
+    :type help_text: str
+    :return: Salient sections joined by blank lines
+    :rtype: str
+    """
+    salient = "\n\n".join(m.group(0).strip() for m in _SALIENT_RE.finditer(help_text))
+    return salient if len(salient) >= _SALIENT_MIN_FRACTION * len(help_text) else help_text
+
+def _partial_option_count(chunk: Union[CmdSawResult, Dict[str, Any], None]) -> int:
+    """
+    Count the tool options in a (possibly partial) streamed result.
+
+    :param chunk: Streamed structured-output chunk
+    :type chunk: Union[CmdSawResult, Dict[str, Any], None]
+    :return: Number of options received so far
+    :rtype: int
+    """
+    if isinstance(chunk, CmdSawResult):
+        return len(chunk.tool.options)
+    if isinstance(chunk, dict):
+        return len((chunk.get("tool") or {}).get("options") or [])
+    return 0
+
+def _root_node(result: CmdSawResult) -> CommandDoc:
+    """
+    Represent the root command of a result as a CommandDoc node.
+
+    :param result: Parsed command result
+    :type result: CmdSawResult
+    :return: Root command node, with its subcommands listed by name
+    :rtype: CommandDoc
+    """
+    tool = result.tool
+    return CommandDoc(
+        name=tool.command,
+        path=tool.command,
+        help_text=tool.help_text,
+        options=tool.options,
+        positionals=tool.positionals,
+        subcommands=[sub.name for sub in tool.subcommands],
+        supports_piped_output=tool.supports_piped_output,
+    )
+
+def _merge_verified(result: CmdSawResult, verified: Dict[str, CommandDoc]) -> CmdSawResult:
+    """
+    Merge verified command nodes back onto the original result, by path.
+
+    Nodes without a verified counterpart (chunk failed or node missing from
+    the response) are kept as they were. Name, path and help text always come
+    from the original node, and the tree shape (which subcommand nodes exist)
+    is the one discovery produced.
+
+    :param result: Original result
+    :type result: CmdSawResult
+    :param verified: Verified nodes keyed by command path
+    :type verified: Dict[str, CommandDoc]
+    :return: Merged result
+    :rtype: CmdSawResult
+    """
+    def merged(node: CommandDoc) -> CommandDoc:
+        doc = verified.get(node.path)
+        if doc is None:
+            return node
+        return doc.model_copy(update={"name": node.name, "path": node.path, "help_text": node.help_text})
+
+    root = merged(_root_node(result))
+    tool = result.tool.model_copy(update={
+        "options": root.options,
+        "positionals": root.positionals,
+        "supports_piped_output": root.supports_piped_output,
+        "subcommands": [merged(sub) for sub in result.tool.subcommands],
+    })
+    return result.model_copy(update={"tool": tool})
+
+async def _ainvoke_double_check_chunk(structured, nodes: List[CommandDoc]) -> CommandDocBatch:
+    """
+    Verify one chunk of command nodes against their help texts.
+
+    Only the chunk's own nodes are sent, not the whole result, and their
+    help text is left out of the JSON since it is shown separately.
+
+    :param structured: Structured-output runnable returning CommandDocBatch
+    :param nodes: Command nodes to verify
+    :type nodes: List[CommandDoc]
+    :return: Verified nodes
+    :rtype: CommandDocBatch
+    """
+    # Normalized help keeps the prompt, and so the LLM response cache key,
+    # stable across reruns that only differ in whitespace or terminal width
+    help_text_summary = "\n\n".join([f"Command: {node.path}\nHelp Text:\n{_extract_salient_sections(normalize_help_text(node.help_text))}" for node in nodes])
+    current_json = CommandDocBatch(docs=nodes).model_dump_json(indent=2, exclude={"docs": {"__all__": {"help_text"}}})
+    user_prompt = f"""Original help text(s):
+{help_text_summary}
+
+Current parsed JSON:
+{current_json}
+
+Please verify each command node against its help text and return corrected nodes if any issues are found.
+If a node is correct, return it unchanged."""
+    return await structured.ainvoke([
+        {"role": "system", "content": _DOUBLECHECK_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ])
+
+def _iter_json_view(result: CmdSawResult) -> Iterator[str]:
+    """
+    Yield the full-JSON view line by line for the pager.
+
+    :param result: Result to display
+    :type result: CmdSawResult
+    :return: Iterator over output lines, including header and footer rules
+    :rtype: Iterator[str]
+    """
+    yield "\n" + "=" * 80 + "\n"
+    yield "FULL JSON OUTPUT\n"
+    yield "=" * 80 + "\n"
+    for line in to_json(result).splitlines():
+        yield line + "\n"
+    yield "=" * 80 + "\n"
 
 def display_json_summary(result: CmdSawResult) -> None:
     """
@@ -16,41 +232,44 @@ def display_json_summary(result: CmdSawResult) -> None:
     :return: None
     :rtype: None
     """
-    click.echo("\n" + "=" * 80)
-    click.echo("JSON PARSING RESULT SUMMARY")
-    click.echo("=" * 80)
-    
     tool = result.tool
-    click.echo(f"\nTool: {tool.command}")
+    diagnostics = result.diagnostics
+    lines = ["\n" + "=" * 80, "JSON PARSING RESULT SUMMARY", "=" * 80, f"\nTool: {tool.command}"]
     if tool.version:
-        click.echo(f"Version: {tool.version}")
+        lines.append(f"Version: {tool.version}")
     
-    click.echo(f"\nOptions: {len(tool.options)}")
-    for opt in tool.options[:5]:  # Show first 5
+    n_opts = len(tool.options)
+    lines.append(f"\nOptions: {n_opts}")
+    for opt in islice(tool.options, 5):  # Show first 5
         flag = opt.long or opt.short or "unknown"
-        click.echo(f"  - {flag}: {opt.description or '(no description)'}")
-    if len(tool.options) > 5:
-        click.echo(f"  ... and {len(tool.options) - 5} more")
-    
-    click.echo(f"\nPositionals: {len(tool.positionals)}")
-    for pos in tool.positionals[:3]:  # Show first 3
-        click.echo(f"  - {pos.name}: {pos.description or '(no description)'}")
-    if len(tool.positionals) > 3:
-        click.echo(f"  ... and {len(tool.positionals) - 3} more")
+        lines.append(f"  - {flag}: {opt.description or '(no description)'}")
+    if n_opts > 5:
+        lines.append(f"  ... and {n_opts - 5} more")
     
-    click.echo(f"\nSubcommands: {len(tool.subcommands)}")
-    for subcmd in tool.subcommands[:10]:  # Show first 10
-        click.echo(f"  - {subcmd.name} ({len(subcmd.options)} options, {len(subcmd.positionals)} positionals)")
-    if len(tool.subcommands) > 10:
-        click.echo(f"  ... and {len(tool.subcommands) - 10} more")
+    n_pos = len(tool.positionals)
+    lines.append(f"\nPositionals: {n_pos}")
+    for pos in islice(tool.positionals, 3):  # Show first 3
+        lines.append(f"  - {pos.name}: {pos.description or '(no description)'}")
+    if n_pos > 3:
+        lines.append(f"  ... and {n_pos - 3} more")
     
-    click.echo(f"\nDiagnostics:")
-    click.echo(f"  - Total commands visited: {result.diagnostics.visited_commands}")
-    click.echo(f"  - Timeouts: {result.diagnostics.timeouts}")
-    click.echo(f"  - LLM retries: {result.diagnostics.llm_retries}")
-    click.echo(f"  - Version extracted: {result.diagnostics.version_extracted}")
+    n_sub = len(tool.subcommands)
+    lines.append(f"\nSubcommands: {n_sub}")
+    for subcmd in islice(tool.subcommands, 10):  # Show first 10
+        lines.append(f"  - {subcmd.name} ({len(subcmd.options)} options, {len(subcmd.positionals)} positionals)")
+    if n_sub > 10:
+        lines.append(f"  ... and {n_sub - 10} more")
     
-    click.echo("=" * 80)
+    lines += [
+        f"\nDiagnostics:",
+        f"  - Total commands visited: {diagnostics.visited_commands}",
+        f"  - Timeouts: {diagnostics.timeouts}",
+        f"  - LLM retries: {diagnostics.llm_retries}",
+        f"  - Version extracted: {diagnostics.version_extracted}",
+        "=" * 80,
+    ]
+    # One write for the whole summary instead of one per line
+    click.echo("\n".join(lines))
 
 
 def review_json_interactive(result: CmdSawResult, model_name: str, provider: str, temperature: float, google_api_key: Optional[str], all_docs: List[CommandDoc]) -> CmdSawResult:
@@ -94,12 +313,7 @@ def review_json_interactive(result: CmdSawResult, model_name: str, provider: str
             return result
         
         elif choice.lower() == 'v':
-            json_str = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
-            click.echo("\n" + "=" * 80)
-            click.echo("FULL JSON OUTPUT")
-            click.echo("=" * 80)
-            click.echo(json_str)
-            click.echo("=" * 80)
+            click.echo_via_pager(_iter_json_view(result))
         
         elif choice.lower() == 'f':
             issues = click.prompt("\nDescribe the issues you want the LLM to fix")
@@ -133,35 +347,12 @@ def llm_fix_issues(result: CmdSawResult, model_name: str, provider: str, tempera
     :return: Fixed result
     :rtype: CmdSawResult
     """
-    # Build model
-    if provider == "google":
-        if not google_api_key:
-            raise ValueError("Google API key is required when using the 'google' provider")
-        model = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=temperature,
-            google_api_key=google_api_key
-        )
-    elif provider == "ollama":
-        model = ChatOllama(model=model_name, temperature=temperature)
-    else:
-        raise ValueError(f"Unknown provider: {provider}")
-    
-    # Create structured output model
-    structured = model.with_structured_output(CmdSawResult)
+    # Reuse the structured output models across review rounds
+    patcher = _structured_model(model_name, provider, temperature, google_api_key, CmdSawPatchSet)
+    structured = _structured_model(model_name, provider, temperature, google_api_key, CmdSawResult)
     
     # Build prompt
-    current_json = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
-    
-    system_prompt = """You are a JSON correction assistant. The user has identified issues with a parsed CLI command structure.
-Your task is to fix these specific issues while preserving all other correct information.
-
-Rules:
-- Fix ONLY the issues described by the user
-- Preserve all other data exactly as it was
-- Return a complete, valid CmdSawResult JSON object
-- Do not add or remove information that wasn't mentioned in the issues
-"""
+    current_json = to_json(result)
     
     user_prompt = f"""Current JSON:
 {current_json}
@@ -169,13 +360,33 @@ Rules:
 Issues to fix:
 {issues}
 
-Please return the corrected JSON that addresses these specific issues."""
+Please address these specific issues."""
     
+    # Ask for targeted patches first so only the changed values are generated
     try:
-        corrected: CmdSawResult = structured.invoke([
-            {"role": "system", "content": system_prompt},
+        patch_set: CmdSawPatchSet = patcher.invoke([
+            {"role": "system", "content": _PATCH_SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
         ])
+        if patch_set and patch_set.patches:
+            corrected = _apply_patches(result, patch_set.patches)
+            click.echo(f"  Applied {len(patch_set.patches)} targeted patch(es)")
+            return corrected
+    except Exception as e:
+        click.echo(f"  Targeted patch failed ({e}); regenerating the full JSON")
+    
+    try:
+        # Stream so progress shows while the model is still generating
+        corrected: Union[CmdSawResult, Dict[str, Any], None] = None
+        for chunk in structured.stream([
+            {"role": "system", "content": _FIX_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]):
+            corrected = chunk
+            click.echo(f"\r  Receiving fix... {_partial_option_count(chunk)} options so far", nl=False)
+        click.echo()
+        if not isinstance(corrected, CmdSawResult):
+            corrected = CmdSawResult.model_validate(corrected)
         return corrected
     except Exception as e:
         click.echo(f"Warning: LLM fix failed: {e}")
@@ -183,7 +394,7 @@ Please return the corrected JSON that addresses these specific issues."""
         return result
 
 
-def llm_double_check(result: CmdSawResult, model_name: str, provider: str, temperature: float, google_api_key: Optional[str], all_docs: List[CommandDoc]) -> CmdSawResult:
+def llm_double_check(result: CmdSawResult, model_name: str, provider: str, temperature: float, google_api_key: Optional[str], all_docs: List[CommandDoc], cache: Optional[ParseCache] = None) -> CmdSawResult:
     """
     Use LLM to automatically verify and correct the parsed result.
     
@@ -194,6 +405,10 @@ def llm_double_check(result: CmdSawResult, model_name: str, provider: str, tempe
     - Missing descriptions
     - Structural issues
     
+    The root command and each subcommand node are verified in chunks; every
+    chunk sees only its own nodes' JSON and help text, and the verified nodes
+    are merged back onto the original result by path.
+    
     :param result: The parsed command result to verify
     :type result: CmdSawResult
     :param model_name: Model name for LLM
@@ -204,8 +419,11 @@ def llm_double_check(result: CmdSawResult, model_name: str, provider: str, tempe
     :type temperature: float
     :param google_api_key: Google API key (if using Google provider)
     :type google_api_key: Optional[str]
-    :param all_docs: All parsed command documents
+    :param all_docs: All parsed command documents (kept for API compatibility;
+        the nodes of ``result`` and their help texts are what gets verified)
     :type all_docs: List[CommandDoc]
+    :param cache: Optional parse cache used to skip previously confirmed results
+    :type cache: Optional[ParseCache]
     :return: Verified (and potentially corrected) result
     :rtype: CmdSawResult
     """
@@ -213,71 +431,37 @@ def llm_double_check(result: CmdSawResult, model_name: str, provider: str, tempe
     click.echo("PERFORMING LLM DOUBLE-CHECK")
     click.echo("=" * 80)
     
-    # Build model
-    if provider == "google":
-        if not google_api_key:
-            raise ValueError("Google API key is required when using the 'google' provider")
-        model = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=temperature,
-            google_api_key=google_api_key
-        )
-    elif provider == "ollama":
-        model = ChatOllama(model=model_name, temperature=temperature)
-    else:
-        raise ValueError(f"Unknown provider: {provider}")
-    
-    # Create structured output model
-    structured = model.with_structured_output(CmdSawResult)
-    
-    # Build prompt with original help text and current JSON
-    current_json = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
-    
-    system_prompt = """You are a quality assurance assistant for CLI command parsing.
-Your task is to verify and correct a parsed CLI command structure against the original help text.
-
-Verification checklist:
-1. Are all options and flags from the help text included?
-2. Are parameter types correct (int, float, str, path, bool, choice)?
-3. Are required vs optional parameters correctly identified?
-4. Are default values captured?
-5. Are positional arguments in the correct order?
-6. Are subcommands correctly listed?
-7. Are descriptions clear and accurate?
-
-Rules:
-- Compare the JSON against the original help text
-- Fix any missing or incorrect information
-- Add missing parameters that were in the help text
-- Correct parameter types if they are wrong
-- Ensure all subcommands from help text are listed
-- Preserve correct information
-- Return a complete, valid CmdSawResult JSON object
-"""
+    # Reuse the structured output model across review rounds
+    structured = _structured_model(model_name, provider, temperature, google_api_key, CommandDocBatch)
     
-    # Collect help texts
-    help_texts = {}
-    help_texts[result.tool.command] = result.tool.help_text
-    for doc in all_docs[1:]:  # Skip root which is already in tool
-        help_texts[doc.path] = doc.help_text
+    # Verify the nodes of the result tree; each is merged back by path
+    nodes = [_root_node(result), *result.tool.subcommands]
     
-    help_text_summary = "\n\n".join([f"Command: {path}\nHelp Text:\n{text}" for path, text in list(help_texts.items())[:5]])  # Limit to first 5 to avoid token limits
+    # Skip the LLM when a prior run confirmed this exact tree for the same help
+    verify_help = "\n\n".join(f"{node.path}\n{node.help_text}" for node in nodes)
+    verify_json = result.tool.model_dump_json(exclude={"captured_at"})
+    if cache and cache.is_verified(verify_help, verify_json, model_name):
+        click.echo("✓ Cached verification hit")
+        click.echo("=" * 80)
+        return result
     
-    user_prompt = f"""Original help text(s):
-{help_text_summary}
-
-Current parsed JSON:
-{current_json}
+    # Verify nodes in chunks of 5 to stay within token limits; the chunks
+    # are independent, so their LLM calls run concurrently
+    chunks = [nodes[i:i + 5] for i in range(0, len(nodes), 5)]
 
-Please verify the JSON against the help text and return a corrected version if any issues are found.
-If the JSON is correct, return it unchanged."""
+    async def verify_all() -> List[Union[CommandDocBatch, BaseException]]:
+        return await asyncio.gather(*(_ainvoke_double_check_chunk(structured, chunk) for chunk in chunks), return_exceptions=True)
     
     try:
-        click.echo("Running verification with LLM...")
-        verified: CmdSawResult = structured.invoke([
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ])
+        click.echo(f"Running verification with LLM ({len(chunks)} chunk{'s' if len(chunks) != 1 else ''})...")
+        verified_nodes: Dict[str, CommandDoc] = {}
+        for chunk, out in zip(chunks, asyncio.run(verify_all())):
+            if isinstance(out, BaseException):
+                click.echo(f"Warning: verification failed for {', '.join(node.path for node in chunk)}: {out}")
+                continue
+            wanted = {node.path for node in chunk}
+            verified_nodes.update({doc.path: doc for doc in out.docs if doc.path in wanted})
+        verified = _merge_verified(result, verified_nodes)
         click.echo("✓ LLM double-check complete")
         
         # Show summary of changes if any
@@ -301,6 +485,9 @@ If the JSON is correct, return it unchanged."""
             original_subcommands == verified_subcommands):
             click.echo("  - No changes needed")
         
+        if cache and verified.tool.model_dump(exclude={"captured_at"}) == result.tool.model_dump(exclude={"captured_at"}):
+            cache.mark_verified(verify_help, verify_json, model_name)
+        
         click.echo("=" * 80)
         return verified
         
@@ -1,5 +1,75 @@
 from __future__ import annotations
-import hashlib, json, os
+import atexit, hashlib, json, os, re, shutil, sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import closing
+from functools import lru_cache
+from typing import Dict, Sequence
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from ..serialize import dumps_bytes, loads_bytes
+from ..utils import write_atomic
+
+_WS_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+# Parse cache entries from the old flat layout (before sharding) and shard dirs
+_FLAT_ENTRY_RE = re.compile(r"^(?:help-)?[0-9a-f]{32}\.json$")
+_SHARD_DIR_RE = re.compile(r"^[0-9a-f]{2}$")
+# Part of every parse cache key; bump it whenever key derivation changes
+# (hash function, help normalization) so old entries are abandoned explicitly
+_CACHE_VERSION = 2
+
+# Parse cache files are written off the caller's thread; drained at exit
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="parsecache")
+atexit.register(_WRITE_POOL.shutdown)
+
+def normalize_help_text(help_text: str) -> str:
+    """
+    Normalize help text before hashing it into a cache key.
+
+    Collapses runs of spaces/tabs, strips trailing whitespace and squeezes blank
+    lines, so help output that only differs in column alignment or terminal
+    width (common across sibling subcommands and reruns) maps to the same key.
+
+    :param help_text: Raw help text
+    :type help_text: str
+    :return: Normalized help text
+    :rtype: str
+    """
+    lines = [_WS_RE.sub(" ", line).rstrip() for line in help_text.strip().splitlines()]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines))
+
+@lru_cache(maxsize=1024)
+def _hash_help(help_text: str) -> str:
+    """
+    Hash normalized help text, memoized per process.
+
+    ``ParseCache.get`` and the following ``set`` see the same help text, so
+    the normalize-and-hash pass over multi-KB help runs once per command.
+
+    :param help_text: Raw help text
+    :type help_text: str
+    :return: BLAKE2b hex digest of the normalized help text
+    :rtype: str
+    """
+    return hashlib.blake2b(normalize_help_text(help_text).encode(), digest_size=16).hexdigest()
+
+def _wait_writes(pending: Dict[str, Future]) -> None:
+    """
+    Wait for background cache writes and report any that failed.
+
+    A failed write only loses the cache entry, so it is printed as a warning
+    instead of being raised into the caller.
+
+    :param pending: Write futures keyed by cache file path
+    :type pending: Dict[str, Future]
+    :return: None
+    :rtype: None
+    """
+    wait(list(pending.values()))
+    for path, fut in pending.items():
+        if not fut.cancelled() and fut.exception() is not None:
+            print(f"Warning: failed to write cache entry {path}: {fut.exception()}")
 
 class ParseCache:
     """
@@ -7,7 +77,17 @@ class ParseCache:
 
     Stores parsed command documentation on disk to avoid redundant LLM calls
     for the same command and help text. Cache keys are based on command path,
-    version, model name, and help text hash.
+    version, model name, a hash of the normalized help text and
+    ``_CACHE_VERSION``; entries written under an older key scheme are never
+    read again and are re-parsed on first use. Each result
+    is also stored under a content-only key (model and help text), so a
+    different command printing identical help reuses the parse. Entries are
+    sharded into ``<root>/ab/cd/`` subdirectories by hash prefix, like git's
+    object store, so lookups stay fast with many cached tools. Entries from
+    an older ``_CACHE_VERSION`` can never be hit again, so they are deleted
+    the first time a cache root is opened at the new version. Writes run
+    on a background thread; ``get`` waits for a pending write to the same
+    file, and ``flush`` waits for all of them.
     """
     def __init__(self, root: str | None = None):
         """
@@ -18,6 +98,71 @@ class ParseCache:
         """
         self.root = root or os.path.join(os.path.expanduser("~"), ".cache", "cmdsaw")
         os.makedirs(self.root, exist_ok=True)
+        self._pending: Dict[str, Future] = {}
+        self._drop_stale()
+
+    def _shard(self, h: str, filename: str) -> str:
+        """
+        Place a cache file in its hash-prefix shard directory.
+
+        :param h: Hex digest the file is keyed by
+        :type h: str
+        :param filename: Cache file name
+        :type filename: str
+        :return: Absolute path to the sharded cache file
+        :rtype: str
+        """
+        return os.path.join(self.root, h[:2], h[2:4], filename)
+
+    def _drop_stale(self) -> None:
+        """
+        Delete parse cache entries written under an older ``_CACHE_VERSION``.
+
+        Their keys can no longer be produced, so they would only take up
+        space. A version marker in the cache root makes this run once per
+        version bump rather than on every ``ParseCache`` construction.
+
+        :return: None
+        :rtype: None
+        """
+        marker = os.path.join(self.root, "parse-cache-version")
+        try:
+            with open(marker, encoding="utf-8") as f:
+                if f.read().strip() == str(_CACHE_VERSION):
+                    return
+        except FileNotFoundError:
+            pass
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and _FLAT_ENTRY_RE.match(entry.name):
+                    os.unlink(entry.path)
+                elif entry.is_dir(follow_symlinks=False) and _SHARD_DIR_RE.match(entry.name):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+        write_atomic(marker, str(_CACHE_VERSION).encode())
+
+    def _wait(self, path: str) -> None:
+        """
+        Wait for a pending background write to ``path``, if any, and report
+        it if it failed.
+
+        :param path: Cache file path
+        :type path: str
+        :return: None
+        :rtype: None
+        """
+        pending = self._pending.pop(path, None)
+        if pending is not None:
+            _wait_writes({path: pending})
+
+    def flush(self) -> None:
+        """
+        Wait for all pending background writes to finish, reporting failures.
+
+        :return: None
+        :rtype: None
+        """
+        pending, self._pending = self._pending, {}
+        _wait_writes(pending)
 
     def _key_path(self, command_path: str, version: str | None, model: str, help_hash: str) -> str:
         """
@@ -29,14 +174,50 @@ class ParseCache:
         :type version: str | None
         :param model: Model name used for parsing
         :type model: str
-        :param help_hash: SHA256 hash of the help text
+        :param help_hash: Hash of the normalized help text
         :type help_hash: str
         :return: Absolute path to the cache file
         :rtype: str
         """
-        base = f"{command_path}|{version or 'none'}|{model}|{help_hash}"
+        base = f"v{_CACHE_VERSION}|{command_path}|{version or 'none'}|{model}|{help_hash}"
         h = hashlib.sha256(base.encode()).hexdigest()[:32]
-        return os.path.join(self.root, f"{h}.json")
+        return self._shard(h, f"{h}.json")
+
+    def _content_path(self, model: str, help_hash: str) -> str:
+        """
+        Generate a cache file path keyed only by model and help text content.
+
+        :param model: Model name used for parsing
+        :type model: str
+        :param help_hash: Hash of the normalized help text
+        :type help_hash: str
+        :return: Absolute path to the content-keyed cache file
+        :rtype: str
+        """
+        h = hashlib.blake2b(f"v{_CACHE_VERSION}|{model}|{help_hash}".encode(), digest_size=16).hexdigest()
+        return self._shard(h, f"help-{h}.json")
+
+    def _read(self, path: str) -> dict | None:
+        """
+        Read one cache file, treating a missing or corrupt file as a miss.
+
+        Opens the file directly instead of checking for it first, so a probe
+        costs a single syscall when the entry is absent.
+
+        :param path: Cache file path
+        :type path: str
+        :return: Decoded entry, or None
+        :rtype: dict | None
+        """
+        self._wait(path)
+        try:
+            with open(path, "rb") as f:
+                return loads_bytes(f.read())
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+        except ValueError:  # json and orjson decode errors
+            print(f"Warning: ignoring corrupt cache entry {path}")
+            return None
 
     def get(self, command_path: str, version: str | None, model: str, help_text: str) -> dict | None:
         """
@@ -53,17 +234,27 @@ class ParseCache:
         :return: Cached parse result dict, or None if not cached
         :rtype: dict | None
         """
-        help_hash = hashlib.sha256(help_text.encode()).hexdigest()
+        help_hash = _hash_help(help_text)
         p = self._key_path(command_path, version, model, help_hash)
-        if os.path.exists(p):
-            with open(p, "r", encoding="utf-8") as f:
-                return json.load(f)
+        data = self._read(p)
+        if data is not None:
+            return data
+        data = self._read(self._content_path(model, help_hash))
+        if data is not None:
+            # Same help body parsed for another command; rebind it to this one
+            data["path"] = command_path
+            data["name"] = command_path.split()[-1]
+            return data
         return None
 
     def set(self, command_path: str, version: str | None, model: str, help_text: str, data: dict) -> None:
         """
         Store a parse result in the cache.
 
+        The result is serialized on the calling thread and written in the
+        background; a failed write is reported as a warning by the next
+        ``get`` of the entry or by ``flush``.
+
         :param command_path: Full command path
         :type command_path: str
         :param version: Command version or None
@@ -77,7 +268,135 @@ class ParseCache:
         :return: None
         :rtype: None
         """
-        help_hash = hashlib.sha256(help_text.encode()).hexdigest()
+        help_hash = _hash_help(help_text)
         p = self._key_path(command_path, version, model, help_hash)
-        with open(p, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        raw = dumps_bytes(data)
+        for path in (p, self._content_path(model, help_hash)):
+            self._pending[path] = _WRITE_POOL.submit(write_atomic, path, raw)
+
+    def _verified_path(self, help_text: str, current_json: str, model: str) -> str:
+        """
+        Generate the marker file path for a verified (help text, JSON) pair.
+
+        :param help_text: Help text the JSON was verified against
+        :type help_text: str
+        :param current_json: Serialized result that was verified
+        :type current_json: str
+        :param model: Model name used for verification
+        :type model: str
+        :return: Absolute path to the marker file
+        :rtype: str
+        """
+        base = f"{_hash_help(help_text)}|{hashlib.blake2b(current_json.encode(), digest_size=16).hexdigest()}|{model}"
+        h = hashlib.blake2b(base.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.root, "verified", h)
+
+    def is_verified(self, help_text: str, current_json: str, model: str) -> bool:
+        """
+        Check whether a double-check already confirmed this JSON unchanged.
+
+        :param help_text: Help text the JSON was verified against
+        :type help_text: str
+        :param current_json: Serialized result to check
+        :type current_json: str
+        :param model: Model name used for verification
+        :type model: str
+        :return: True if a verification marker exists
+        :rtype: bool
+        """
+        return os.path.exists(self._verified_path(help_text, current_json, model))
+
+    def mark_verified(self, help_text: str, current_json: str, model: str) -> None:
+        """
+        Record that a double-check returned this JSON unchanged.
+
+        :param help_text: Help text the JSON was verified against
+        :type help_text: str
+        :param current_json: Serialized result that was verified
+        :type current_json: str
+        :param model: Model name used for verification
+        :type model: str
+        :return: None
+        :rtype: None
+        """
+        write_atomic(self._verified_path(help_text, current_json, model), b"")
+
+class LLMResponseCache(BaseCache):
+    """
+    SQLite-backed LangChain cache for raw chat model responses.
+
+    Registered globally via ``set_llm_cache`` so every chat model call (parsing,
+    resource estimation, double-check) returns instantly for a previously seen
+    (prompt, model configuration) pair, including across runs.
+    """
+    def __init__(self, database_path: str | None = None):
+        """
+        Initialize the response cache.
+
+        :param database_path: Optional SQLite file path (defaults to ~/.cache/cmdsaw/llm.db)
+        :type database_path: str | None
+        """
+        self.database_path = database_path or os.path.join(os.path.expanduser("~"), ".cache", "cmdsaw", "llm.db")
+        os.makedirs(os.path.dirname(self.database_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (prompt TEXT, llm_string TEXT, response TEXT, PRIMARY KEY (prompt, llm_string))")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the cache database.
+
+        A fresh connection is used per operation so the cache can be shared by
+        the worker threads in ``build_tree``.
+
+        :return: SQLite connection
+        :rtype: sqlite3.Connection
+        """
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    def lookup(self, prompt: str, llm_string: str) -> list[Generation] | None:
+        """
+        Look up a cached response.
+
+        :param prompt: Serialized prompt sent to the model
+        :type prompt: str
+        :param llm_string: Serialized model configuration
+        :type llm_string: str
+        :return: Cached generations, or None if not cached
+        :rtype: list[Generation] | None
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT response FROM llm_cache WHERE prompt = ? AND llm_string = ?", (prompt, llm_string)).fetchone()
+        if not row:
+            return None
+        return [ChatGeneration(message=msg) for msg in messages_from_dict(json.loads(row[0]))]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        """
+        Store a model response in the cache.
+
+        Only chat generations are cached; anything else is silently skipped.
+
+        :param prompt: Serialized prompt sent to the model
+        :type prompt: str
+        :param llm_string: Serialized model configuration
+        :type llm_string: str
+        :param return_val: Generations returned by the model
+        :type return_val: Sequence[Generation]
+        :return: None
+        :rtype: None
+        """
+        if not all(isinstance(g, ChatGeneration) for g in return_val):
+            return
+        response = json.dumps([message_to_dict(g.message) for g in return_val], ensure_ascii=False)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO llm_cache (prompt, llm_string, response) VALUES (?, ?, ?)", (prompt, llm_string, response))
+
+    def clear(self, **kwargs) -> None:
+        """
+        Remove all cached responses.
+
+        :return: None
+        :rtype: None
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_cache")
@@ -6,11 +6,16 @@ This module parses the EDAM.tsv file to build format mappings.
 The EDAM.tsv file should be included as package data.
 """
 
-import csv
+import mmap
 import os
 import re
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple, Optional
+from ..serialize import dumps_bytes, loads_bytes
+from ..utils import write_atomic
 
 # Try to find EDAM.tsv in common locations
 _EDAM_TSV_PATHS = [
@@ -19,6 +24,76 @@ _EDAM_TSV_PATHS = [
     Path.home() / ".cache" / "cmdsaw" / "EDAM.tsv",
 ]
 
+# Parsed extension map, reused while EDAM.tsv is unchanged
+_EDAM_CACHE_PATH = Path.home() / ".cache" / "cmdsaw" / "edam.json"
+# Bump when _parse_edam_tsv's output changes so stale caches are ignored
+_EDAM_CACHE_VERSION = 1
+
+# Format names that imply common extensions
+_FORMAT_EXTENSIONS = {
+    'fasta': ['.fasta', '.fa', '.fna', '.ffn', '.faa', '.frn'],
+    'fastq': ['.fastq', '.fq'],
+    'bam': ['.bam'],
+    'sam': ['.sam'],
+    'vcf': ['.vcf'],
+    'bcf': ['.bcf'],
+    'bed': ['.bed'],
+    'gff': ['.gff', '.gff3'],
+    'gtf': ['.gtf'],
+    'wig': ['.wig'],
+    'bigwig': ['.bigwig', '.bw'],
+    'bigbed': ['.bigbed', '.bb'],
+    'bedgraph': ['.bedgraph'],
+    'cram': ['.cram'],
+    'maf': ['.maf'],
+    'tsv': ['.tsv', '.tab'],
+    'csv': ['.csv'],
+    'json': ['.json'],
+    'xml': ['.xml'],
+    'html': ['.html', '.htm'],
+    'pdf': ['.pdf'],
+    'png': ['.png'],
+    'jpeg': ['.jpg', '.jpeg'],
+    'gif': ['.gif'],
+    'svg': ['.svg'],
+    'tiff': ['.tiff', '.tif'],
+    'phylip': ['.phylip'],
+    'nexus': ['.nexus'],
+    'newick': ['.newick'],
+    'stockholm': ['.stockholm'],
+    'clustal': ['.clustal'],
+    'pdb': ['.pdb'],
+    'sdf': ['.sdf'],
+    'mol': ['.mol'],
+    'mol2': ['.mol2'],
+    'hdf5': ['.h5', '.hdf5'],
+    'gzip': ['.gz'],
+    'bzip2': ['.bz2'],
+    'zip': ['.zip'],
+    'tar': ['.tar'],
+}
+
+# Any format keyword above; one scan rejects rows that mention none of them
+_FORMAT_NAME_RE = re.compile("|".join(sorted(map(re.escape, _FORMAT_EXTENSIONS), key=len, reverse=True)))
+_MAX_FORMAT_NAME_LEN = max(map(len, _FORMAT_EXTENSIONS))
+
+# Row prefix of EDAM format terms, matched on raw bytes
+_FORMAT_URI_PREFIX = b'http://edamontology.org/format_'
+
+# Dotted extensions mentioned in a format's name, synonyms or description
+_EXTENSION_RE = re.compile(r'\.([a-z0-9]{2,8})(?:\s|,|;|\)|$)')
+
+def _unquote(field: str) -> str:
+    """
+    Strip CSV-style quoting from a TSV field.
+
+    :param field: Raw field text
+    :return: Field with surrounding quotes removed and doubled quotes collapsed
+    """
+    if len(field) > 1 and field[0] == '"' and field[-1] == '"':
+        return field[1:-1].replace('""', '"')
+    return field
+
 def _parse_edam_tsv(tsv_path: str) -> Dict[str, Tuple[str, str]]:
     """
     Parse EDAM.tsv file to extract format mappings.
@@ -26,20 +101,20 @@ def _parse_edam_tsv(tsv_path: str) -> Dict[str, Tuple[str, str]]:
     :param tsv_path: Path to EDAM.tsv file
     :return: Dictionary mapping extensions to (edam_id, label)
     """
-    extension_map = {}
-    
     # Priority mapping: prefer exact format names over derived/specific formats
-    priority_formats = {}  # extension -> list of (format_id, name, priority)
+    priority_formats: Dict[str, Tuple[int, str, str]] = {}  # extension -> best (priority, format_id, name) so far
     
     try:
-        with open(tsv_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t')
-            for row in reader:
-                if not row or not row[0].startswith('http://edamontology.org/format_'):
+        with open(tsv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Plain splitting is enough: EDAM.tsv has no multi-line records,
+            # and most rows are rejected on raw bytes before any decoding
+            for raw in iter(mm.readline, b''):
+                if not raw.startswith(_FORMAT_URI_PREFIX):
                     continue
+                row = [_unquote(field) for field in raw.decode('utf-8').rstrip('\r\n').split('\t', 4)[:4]]
                 
                 uri = row[0]
-                format_id = uri.split('/')[-1]
+                format_id = sys.intern(uri.rsplit('/', 1)[-1])
                 name = row[1].strip() if len(row) > 1 else ''
                 synonyms = row[2].strip() if len(row) > 2 else ''
                 description = row[3].strip() if len(row) > 3 else ''
@@ -47,82 +122,42 @@ def _parse_edam_tsv(tsv_path: str) -> Dict[str, Tuple[str, str]]:
                 if not name:
                     continue
                 
-                # Combine all text fields for searching
-                all_text = f"{name} {synonyms} {description}".lower()
+                name_lower = name.lower()
                 
                 # Determine priority (lower is better)
                 # Prefer simple format names over complex ones
                 priority = len(name)  # Shorter names are simpler
-                if "search" in name.lower() or "results" in name.lower():
+                if "search" in name_lower or "results" in name_lower:
                     priority += 1000  # Deprioritize search/result formats
                 
                 # Extract extensions from various patterns
-                # Pattern 1: Direct extensions like ".bam", ".vcf"
-                extension_pattern = re.findall(r'\.([a-z0-9]{2,8})(?:\s|,|;|\)|$)', all_text)
-                for ext in extension_pattern:
-                    ext_key = f".{ext}"
-                    if ext_key not in priority_formats:
-                        priority_formats[ext_key] = []
-                    priority_formats[ext_key].append((format_id, name, priority))
-                
-                # Pattern 2: Format names that match common extensions
-                format_extensions = {
-                    'fasta': ['.fasta', '.fa', '.fna', '.ffn', '.faa', '.frn'],
-                    'fastq': ['.fastq', '.fq'],
-                    'bam': ['.bam'],
-                    'sam': ['.sam'],
-                    'vcf': ['.vcf'],
-                    'bcf': ['.bcf'],
-                    'bed': ['.bed'],
-                    'gff': ['.gff', '.gff3'],
-                    'gtf': ['.gtf'],
-                    'wig': ['.wig'],
-                    'bigwig': ['.bigwig', '.bw'],
-                    'bigbed': ['.bigbed', '.bb'],
-                    'bedgraph': ['.bedgraph'],
-                    'cram': ['.cram'],
-                    'maf': ['.maf'],
-                    'tsv': ['.tsv', '.tab'],
-                    'csv': ['.csv'],
-                    'json': ['.json'],
-                    'xml': ['.xml'],
-                    'html': ['.html', '.htm'],
-                    'pdf': ['.pdf'],
-                    'png': ['.png'],
-                    'jpeg': ['.jpg', '.jpeg'],
-                    'gif': ['.gif'],
-                    'svg': ['.svg'],
-                    'tiff': ['.tiff', '.tif'],
-                    'phylip': ['.phylip'],
-                    'nexus': ['.nexus'],
-                    'newick': ['.newick'],
-                    'stockholm': ['.stockholm'],
-                    'clustal': ['.clustal'],
-                    'pdb': ['.pdb'],
-                    'sdf': ['.sdf'],
-                    'mol': ['.mol'],
-                    'mol2': ['.mol2'],
-                    'hdf5': ['.h5', '.hdf5'],
-                    'gzip': ['.gz'],
-                    'bzip2': ['.bz2'],
-                    'zip': ['.zip'],
-                    'tar': ['.tar'],
-                }
+                # Pattern 1: Direct extensions like ".bam", ".vcf"; rows with
+                # no dot in any field can't match, so skip building the text
+                if '.' in name or '.' in synonyms or '.' in description:
+                    # Combine all text fields for searching
+                    all_text = f"{name} {synonyms} {description}".lower()
+                    for ext in _EXTENSION_RE.findall(all_text):
+                        # Interned: the same few extensions recur across thousands of rows
+                        ext_key = sys.intern(f".{ext}")
+                        best = priority_formats.get(ext_key)
+                        if best is None or priority < best[0]:
+                            priority_formats[ext_key] = (priority, format_id, name)
                 
-                name_lower = name.lower()
-                for format_name, extensions in format_extensions.items():
-                    # Check if this is an exact match or contains the format name
-                    if name_lower == format_name or (format_name in name_lower and len(name_lower) < len(format_name) + 10):
-                        for ext in extensions:
-                            if ext not in priority_formats:
-                                priority_formats[ext] = []
-                            priority_formats[ext].append((format_id, name, priority))
+                # Pattern 2: Format names that match common extensions.
+                # Names too long or containing no format keyword can't match,
+                # which rules out most rows before the per-keyword checks.
+                if len(name_lower) < _MAX_FORMAT_NAME_LEN + 10 and _FORMAT_NAME_RE.search(name_lower):
+                    for format_name, extensions in _FORMAT_EXTENSIONS.items():
+                        # Check if this is an exact match or contains the format name
+                        if name_lower == format_name or (format_name in name_lower and len(name_lower) < len(format_name) + 10):
+                            for ext in extensions:
+                                best = priority_formats.get(ext)
+                                if best is None or priority < best[0]:
+                                    priority_formats[ext] = (priority, format_id, name)
         
-        # Select best format for each extension (lowest priority value)
-        for ext, candidates in priority_formats.items():
-            if candidates:
-                best = min(candidates, key=lambda x: x[2])
-                extension_map[ext] = (best[0], best[1])
+        # Keep the best format for each extension (lowest priority value;
+        # ties go to the first candidate seen)
+        extension_map = {ext: (format_id, name) for ext, (_, format_id, name) in priority_formats.items()}
                 
     except Exception as e:
         # If EDAM.tsv cannot be parsed, raise an error
@@ -132,44 +167,80 @@ def _parse_edam_tsv(tsv_path: str) -> Dict[str, Tuple[str, str]]:
     
     return extension_map
 
-# Load from EDAM.tsv
-_EDAM_LOADED = {}
-_edam_file_found = False
-for path in _EDAM_TSV_PATHS:
-    if path.exists():
-        _EDAM_LOADED = _parse_edam_tsv(str(path))
-        _edam_file_found = True
-        break
+def _load_edam_cached(tsv_path: Path) -> Dict[str, Tuple[str, str]]:
+    """
+    Load the parsed extension map from the on-disk cache, parsing on a miss.
+
+    The cache is keyed by the TSV's path, mtime and size, so editing or
+    replacing EDAM.tsv triggers a fresh parse. Cache read or write failures
+    fall back to parsing.
+
+    :param tsv_path: Path to EDAM.tsv
+    :return: Dictionary mapping extensions to (edam_id, label)
+    """
+    st = tsv_path.stat()
+    key = [_EDAM_CACHE_VERSION, str(tsv_path), st.st_mtime_ns, st.st_size]
+    try:
+        cached = loads_bytes(_EDAM_CACHE_PATH.read_bytes())
+        if cached["key"] == key:
+            return {ext: tuple(entry) for ext, entry in cached["map"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    extension_map = _parse_edam_tsv(str(tsv_path))
+    try:
+        write_atomic(str(_EDAM_CACHE_PATH), dumps_bytes({"key": key, "map": extension_map}))
+    except OSError:
+        pass
+    return extension_map
+
+@lru_cache(maxsize=1)
+def _load_edam() -> Mapping[str, Tuple[str, str]]:
+    """
+    Parse the first EDAM.tsv found, once per process.
+
+    Loading is deferred to the first lookup so importing this module stays
+    cheap for runs that never need format mappings. The map is returned
+    read-only because it is shared by every caller.
 
-if not _edam_file_found:
+    :return: Read-only mapping of extensions to (edam_id, label)
+    """
+    for path in _EDAM_TSV_PATHS:
+        if path.exists():
+            return MappingProxyType(_load_edam_cached(path))
     import warnings
     warnings.warn(
         "EDAM.tsv file not found. File format mappings will be unavailable. "
         "Please ensure EDAM.tsv is included in the package.",
         RuntimeWarning
     )
+    return MappingProxyType({})
+
+def __getattr__(name: str):
+    """
+    Resolve ``EXTENSION_TO_EDAM`` lazily (PEP 562).
 
-# Use only the loaded mappings from EDAM.tsv
-EXTENSION_TO_EDAM = _EDAM_LOADED
+    :param name: Attribute name
+    :return: The loaded extension map
+    """
+    if name == "EXTENSION_TO_EDAM":
+        return _load_edam()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+@lru_cache(maxsize=4096)
 def get_edam_format(extension: str) -> Optional[Tuple[str, str]]:
     """
     Get EDAM format ID and label for a file extension.
     
-    :param extension: File extension (with or without leading dot)
+    Results are memoized, since large tool trees look up the same handful
+    of extensions for thousands of parameters.
+    
+    :param extension: File extension (with or without leading dot, any case)
     :return: Tuple of (edam_id, edam_label) or None if not found
     """
     if not extension:
         return None
-    
-    # Ensure extension starts with dot
-    if not extension.startswith('.'):
-        extension = '.' + extension
-    
-    # Convert to lowercase for matching
     extension = extension.lower()
-    
-    return EXTENSION_TO_EDAM.get(extension)
+    return _load_edam().get(extension if extension.startswith('.') else '.' + extension)
 
 def get_edam_uri(edam_id: str) -> str:
     """
@@ -1,15 +1,32 @@
 from __future__ import annotations
-from typing import Optional, Tuple, Union
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from pydantic import ValidationError
-from .schema import CommandDoc
-from .prompts import SYSTEM_PROMPT, FEWSHOT, EMPHASIZED_SUBCOMMAND_PROMPT
+from .schema import CommandDoc, CommandDocBatch
+from .cache import normalize_help_text
+from .template_parser import try_template_parse
+from .prompts import SYSTEM_PROMPT, FEWSHOT_BLOB, EMPHASIZED_SUBCOMMAND_PROMPT, BATCH_PROMPT_SUFFIX
+from ..constants import DEFAULT_KEEP_ALIVE, DEFAULT_NUM_CTX, DEFAULT_PARSE_BATCH_SIZE, DEFAULT_BATCH_TOKEN_BUDGET, MIN_HELP_TEXT_CHARS
 from langchain_ollama import ChatOllama
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+# System prompts with few-shot examples, assembled once at import
+_SYSTEM_WITH_FEWSHOT = SYSTEM_PROMPT + FEWSHOT_BLOB
+_BATCH_SYSTEM_PROMPT = _SYSTEM_WITH_FEWSHOT + BATCH_PROMPT_SUFFIX
+_EMPHASIZED_WITH_FEWSHOT = EMPHASIZED_SUBCOMMAND_PROMPT + FEWSHOT_BLOB
+_RETRY_REMINDER = "\nReminder: Return ONLY valid JSON matching the CommandDoc schema."
+
+@lru_cache(maxsize=None)
 def _build_model(model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None) -> Union[ChatOllama, ChatGoogleGenerativeAI]:
     """
     Create a chat model instance for LLM parsing.
 
+    Ollama models are kept loaded between calls (``keep_alive``) so the server
+    can reuse its KV cache for the static system prompt prefix shared by every
+    parse, and get a context window large enough for prompt plus help text.
+    Instances are memoized per argument set, so every parse reuses the same
+    underlying HTTP client and its keep-alive connections.
+
     :param model_name: Name of the model to use
     :type model_name: str
     :param provider: LLM provider ('ollama' or 'google')
@@ -30,11 +47,35 @@ def _build_model(model_name: str, provider: str = "ollama", temperature: float =
             google_api_key=google_api_key
         )
     elif provider == "ollama":
-        return ChatOllama(model=model_name, temperature=temperature)
+        return ChatOllama(model=model_name, temperature=temperature, keep_alive=DEFAULT_KEEP_ALIVE, num_ctx=DEFAULT_NUM_CTX)
     else:
         raise ValueError(f"Unknown provider: {provider}. Must be 'ollama' or 'google'")
 
-def parse_command_help(*, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, command_path: str, help_text: str, retries: int = 2, cache_getset: Optional[Tuple] = None) -> CommandDoc:
+
+@lru_cache(maxsize=None)
+def _structured_model(model_name: str, provider: str, temperature: float, google_api_key: Optional[str], schema: type):
+    """
+    Build (once per settings and schema) a chat model bound to ``schema`` structured output.
+
+    Binding a schema is comparatively expensive for large models like
+    CmdSawResult, and every parse, estimate and review round with the same
+    settings reuses the same runnable.
+
+    :param model_name: Name of the model to use
+    :type model_name: str
+    :param provider: LLM provider ('ollama' or 'google')
+    :type provider: str
+    :param temperature: Model temperature
+    :type temperature: float
+    :param google_api_key: Google API key (if using Google provider)
+    :type google_api_key: Optional[str]
+    :param schema: Pydantic model the output is parsed into
+    :type schema: type
+    :return: Structured-output runnable
+    """
+    return _build_model(model_name, provider, temperature, google_api_key).with_structured_output(schema)
+
+def parse_command_help(*, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, command_path: str, help_text: str, retries: int = 2, cache_getset: Optional[Tuple] = None, template_parse: bool = False) -> CommandDoc:
     """
     Parse command help text using an LLM to extract structured documentation.
 
@@ -58,9 +99,14 @@ def parse_command_help(*, model_name: str, provider: str = "ollama", temperature
     :type retries: int
     :param cache_getset: Optional tuple of (get_func, set_func) for caching
     :type cache_getset: Optional[Tuple]
+    :param template_parse: Parse argparse/click generated help without the LLM
+    :type template_parse: bool
     :return: Parsed command documentation
     :rtype: CommandDoc
     """
+    if template_parse and (doc := try_template_parse(command_path, help_text)):
+        print(f"  Parsed from help template: {command_path}")
+        return doc
     cache_get, cache_set = (cache_getset or (None, None))
     if cache_get:
         cached = cache_get(command_path, None, model_name, help_text)
@@ -70,18 +116,15 @@ def parse_command_help(*, model_name: str, provider: str = "ollama", temperature
         print(f"  Cache MISS for: {command_path}")
 
     print(f"  Parsing with LLM model {model_name} (provider: {provider})...")
-    model = _build_model(model_name, provider, temperature, google_api_key)
-    structured = model.with_structured_output(CommandDoc)
+    structured = _structured_model(model_name, provider, temperature, google_api_key, CommandDoc)
 
-    fewshot_blob = ""
-    for ex in FEWSHOT:
-        fewshot_blob += f"\n### Example help:\n{ex['help_text']}\n### Example JSON:\n{ex['json']}\n"
-    user_blob = f"command_path: {command_path}\n\nhelp_text:\n{help_text}\n"
+    base_user = f"command_path: {command_path}\n\nhelp_text:\n{help_text}\n"
+    user_blob = base_user
 
     for attempt in range(retries + 1):
         try:
             result: CommandDoc = structured.invoke([
-                {"role": "system", "content": SYSTEM_PROMPT + fewshot_blob},
+                {"role": "system", "content": _SYSTEM_WITH_FEWSHOT},
                 {"role": "user", "content": user_blob},
             ])
             print(f"  Successfully parsed: {command_path}")
@@ -100,7 +143,204 @@ def parse_command_help(*, model_name: str, provider: str = "ollama", temperature
             print(f"  Validation error on attempt {attempt + 1}:")
             print(f"  {error_msg[:150]}{'...' if len(error_msg) > 150 else ''}")
             print(f"  Retrying...")
-            user_blob += "\nReminder: Return ONLY valid JSON matching the CommandDoc schema."
+            # One reminder at most, so retries don't grow the prompt
+            user_blob = base_user + _RETRY_REMINDER
+
+def parse_command_help_batch(*, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, items: List[Tuple[str, str]], retries: int = 2, cache_getset: Optional[Tuple] = None, concurrency: int = 1, batch_size: int = DEFAULT_PARSE_BATCH_SIZE, on_parsed: Optional[Callable[[int, CommandDoc], None]] = None, template_parse: bool = False) -> List[CommandDoc]:
+    """
+    Parse several commands' help text with as few LLM requests as possible.
+
+    Commands whose help text is empty or shorter than ``MIN_HELP_TEXT_CHARS``
+    get an empty doc without an LLM call, as do argparse/click generated help
+    texts when ``template_parse`` is set. Cache hits are resolved next and
+    commands whose normalized help text is identical are parsed only once.
+    The remaining help texts are grouped into chunks of up to ``batch_size``
+    commands and ``DEFAULT_BATCH_TOKEN_BUDGET`` estimated tokens, and each
+    chunk is sent as one multi-command prompt, so prompt prefill and round-trip latency are paid
+    once per chunk rather than once per command. Chunks are submitted in a
+    single ``batch`` call on one structured-output model. Commands missing
+    from a chunk's response, or whose chunk failed validation, fall back to
+    :func:`parse_command_help` and its retry logic. Chunks are handled in
+    completion order and ``on_parsed`` is called as soon as each command's
+    doc is available, so callers can start follow-up work early.
+
+    :param model_name: Name of the model to use for parsing
+    :type model_name: str
+    :param provider: LLM provider ('ollama' or 'google')
+    :type provider: str
+    :param temperature: Model temperature (0.0 = deterministic)
+    :type temperature: float
+    :param google_api_key: Google API key (required for Google provider)
+    :type google_api_key: Optional[str]
+    :param items: List of (command_path, help_text) pairs
+    :type items: List[Tuple[str, str]]
+    :param retries: Number of retry attempts on validation failure
+    :type retries: int
+    :param cache_getset: Optional tuple of (get_func, set_func) for caching
+    :type cache_getset: Optional[Tuple]
+    :param concurrency: Maximum number of in-flight LLM requests
+    :type concurrency: int
+    :param batch_size: Maximum number of commands per LLM request
+    :type batch_size: int
+    :param on_parsed: Optional callback receiving (index into ``items``, doc)
+    :type on_parsed: Optional[Callable[[int, CommandDoc], None]]
+    :param template_parse: Parse argparse/click generated help without the LLM
+    :type template_parse: bool
+    :return: Parsed command documentation, in the same order as ``items``
+    :rtype: List[CommandDoc]
+    """
+    cache_get, cache_set = (cache_getset or (None, None))
+    results: List[Optional[CommandDoc]] = [None] * len(items)
+    misses: List[int] = []
+    first_by_help: Dict[str, int] = {}
+    duplicates: List[Tuple[int, int]] = []
+    for i, (command_path, help_text) in enumerate(items):
+        if len(help_text.strip()) < MIN_HELP_TEXT_CHARS:
+            print(f"  Help text too short, skipping LLM for: {command_path}")
+            results[i] = CommandDoc(name=command_path.split()[-1], path=command_path, help_text=help_text)
+            if on_parsed:
+                on_parsed(i, results[i])
+            continue
+        if template_parse and (doc := try_template_parse(command_path, help_text)):
+            print(f"  Parsed from help template: {command_path}")
+            results[i] = doc
+            if on_parsed:
+                on_parsed(i, doc)
+            continue
+        cached = cache_get(command_path, None, model_name, help_text) if cache_get else None
+        if cached:
+            print(f"  Cache HIT for: {command_path}")
+            results[i] = CommandDoc.model_validate(cached)
+            if on_parsed:
+                on_parsed(i, results[i])
+            continue
+        if cache_get:
+            print(f"  Cache MISS for: {command_path}")
+        first = first_by_help.setdefault(normalize_help_text(help_text), i)
+        if first == i:
+            misses.append(i)
+        else:
+            duplicates.append((i, first))
+    if misses:
+        _parse_misses(
+            model_name=model_name,
+            provider=provider,
+            temperature=temperature,
+            google_api_key=google_api_key,
+            items=items,
+            misses=misses,
+            results=results,
+            retries=retries,
+            cache_set=cache_set,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            on_parsed=on_parsed,
+        )
+    for i, first in duplicates:
+        command_path, help_text = items[i]
+        print(f"  Reusing parse of {items[first][0]} for identical help: {command_path}")
+        results[i] = results[first].model_copy(deep=True, update={"path": command_path, "name": command_path.split()[-1], "help_text": help_text})
+        if cache_set:
+            cache_set(command_path, None, model_name, help_text, results[i].model_dump())
+        if on_parsed:
+            on_parsed(i, results[i])
+    return results
+
+def _chunk_by_tokens(indices: List[int], est_tokens: List[int], max_items: int, token_budget: int) -> List[List[int]]:
+    """
+    Group indices into request chunks bounded by item count and estimated tokens.
+
+    A chunk is closed when adding the next item would exceed ``max_items`` or
+    push its estimated prompt-plus-output tokens past ``token_budget``, so a
+    few very long help texts get requests of their own while short ones are
+    packed together. An item larger than the budget still forms its own chunk.
+
+    :param indices: Item indices, in submission order
+    :type indices: List[int]
+    :param est_tokens: Estimated tokens for each entry of ``indices``
+    :type est_tokens: List[int]
+    :param max_items: Maximum number of items per chunk
+    :type max_items: int
+    :param token_budget: Maximum estimated tokens per chunk
+    :type token_budget: int
+    :return: List of index chunks
+    :rtype: List[List[int]]
+    """
+    max_items = max(1, max_items)
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, tokens in zip(indices, est_tokens):
+        if current and (len(current) >= max_items or used + tokens > token_budget):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _parse_misses(*, model_name: str, provider: str, temperature: float, google_api_key: Optional[str], items: List[Tuple[str, str]], misses: List[int], results: List[Optional[CommandDoc]], retries: int, cache_set, concurrency: int, batch_size: int, on_parsed: Optional[Callable[[int, CommandDoc], None]] = None) -> None:
+    """
+    Parse uncached commands in multi-command chunks, filling ``results`` in place.
+
+    :param items: List of (command_path, help_text) pairs
+    :type items: List[Tuple[str, str]]
+    :param misses: Indices into ``items`` that still need an LLM parse
+    :type misses: List[int]
+    :param results: Output list, indexed like ``items``
+    :type results: List[Optional[CommandDoc]]
+    :param cache_set: Optional cache setter, or None
+    :param on_parsed: Optional callback receiving (index into ``items``, doc)
+    :type on_parsed: Optional[Callable[[int, CommandDoc], None]]
+    :return: None
+    :rtype: None
+    """
+    chunks = _chunk_by_tokens(misses, [len(items[i][1]) // 4 + 512 for i in misses], batch_size, DEFAULT_BATCH_TOKEN_BUDGET)
+    print(f"  Parsing {len(misses)} command(s) in {len(chunks)} request(s) with LLM model {model_name} (provider: {provider})...")
+    structured = _structured_model(model_name, provider, temperature, google_api_key, CommandDocBatch)
+
+    prompts = [
+        [
+            # Batch instructions go after the few-shot examples so batched and
+            # single-command prompts share the longest possible cached prefix
+            {"role": "system", "content": _BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": "".join(
+                f"---\ncommand_path: {items[i][0]}\n\nhelp_text:\n{items[i][1]}\n" for i in chunk
+            )},
+        ]
+        for chunk in chunks
+    ]
+    outputs = structured.batch_as_completed(prompts, config={"max_concurrency": max(1, concurrency)}, return_exceptions=True)
+
+    for n, out in outputs:
+        chunk = chunks[n]
+        if isinstance(out, Exception) and not isinstance(out, ValidationError):
+            raise out
+        by_path = {doc.path: doc for doc in out.docs} if isinstance(out, CommandDocBatch) else {}
+        for i in chunk:
+            command_path, help_text = items[i]
+            doc = by_path.get(command_path)
+            if doc is not None:
+                print(f"  Successfully parsed: {command_path}")
+                if cache_set:
+                    cache_set(command_path, None, model_name, help_text, doc.model_dump())
+                    print(f"  Cached result for: {command_path}")
+                results[i] = doc
+            else:
+                print(f"  No valid batched result for {command_path}, retrying individually...")
+                results[i] = parse_command_help(
+                    model_name=model_name,
+                    provider=provider,
+                    temperature=temperature,
+                    google_api_key=google_api_key,
+                    command_path=command_path,
+                    help_text=help_text,
+                    retries=max(0, retries - 1),
+                    cache_getset=(None, cache_set),
+                )
+            if on_parsed:
+                on_parsed(i, results[i])
 
 def parse_command_help_with_emphasis(*, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, command_path: str, help_text: str, retries: int = 2, cache_getset: Optional[Tuple] = None) -> CommandDoc:
     """
@@ -129,18 +369,15 @@ def parse_command_help_with_emphasis(*, model_name: str, provider: str = "ollama
     :rtype: CommandDoc
     """
     print(f"  Re-parsing with EMPHASIZED subcommand detection for: {command_path}")
-    model = _build_model(model_name, provider, temperature, google_api_key)
-    structured = model.with_structured_output(CommandDoc)
+    structured = _structured_model(model_name, provider, temperature, google_api_key, CommandDoc)
 
-    fewshot_blob = ""
-    for ex in FEWSHOT:
-        fewshot_blob += f"\n### Example help:\n{ex['help_text']}\n### Example JSON:\n{ex['json']}\n"
-    user_blob = f"command_path: {command_path}\n\nhelp_text:\n{help_text}\n"
+    base_user = f"command_path: {command_path}\n\nhelp_text:\n{help_text}\n"
+    user_blob = base_user
 
     for attempt in range(retries + 1):
         try:
             result: CommandDoc = structured.invoke([
-                {"role": "system", "content": EMPHASIZED_SUBCOMMAND_PROMPT + fewshot_blob},
+                {"role": "system", "content": _EMPHASIZED_WITH_FEWSHOT},
                 {"role": "user", "content": user_blob},
             ])
             print(f"  Successfully re-parsed: {command_path}")
@@ -161,4 +398,5 @@ def parse_command_help_with_emphasis(*, model_name: str, provider: str = "ollama
             print(f"  Validation error on attempt {attempt + 1}:")
             print(f"  {error_msg[:150]}{'...' if len(error_msg) > 150 else ''}")
             print(f"  Retrying...")
-            user_blob += "\nReminder: Return ONLY valid JSON matching the CommandDoc schema."
+            # One reminder at most, so retries don't grow the prompt
+            user_blob = base_user + _RETRY_REMINDER
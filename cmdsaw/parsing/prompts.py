@@ -1,3 +1,10 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup, installed with the "fast" extra
+    orjson = None
+
 SYSTEM_PROMPT = """You convert raw CLI help text into a structured JSON object for one command node.
 
 Rules:
@@ -71,6 +78,14 @@ PAY SPECIAL ATTENTION to discovering ALL available subcommands. This is the MOST
 Return only JSON.
 """
 
+BATCH_PROMPT_SUFFIX = """
+**Multiple commands**
+The user message contains several command nodes, each in a block starting with `---`
+followed by `command_path:` and `help_text:`. Parse every block independently and
+return them in `docs`, one object per block, with `path` set exactly to that block's
+command_path.
+"""
+
 FEWSHOT = [
     {
         "help_text": "imgkit 1.4.0\n\nUSAGE:\n  imgkit [OPTIONS] <INPUT> [OUTPUT]\n\nOPTIONS:\n  -q, --quality INT           JPEG quality (default: 90)\n      --format {png|jpg|webp} Output format\n  -v, --verbose               Increase verbosity\n  -t, --threads INT           Number of worker threads (default: 4)\n      --no-color              Disable colored output\n\nARGUMENTS:\n  INPUT                        Source file path\n  OUTPUT                       Destination path\n",
@@ -179,3 +194,27 @@ FEWSHOT = [
         }
     }
 ]
+
+def _compact_json(data) -> str:
+    """
+    Serialize a few-shot example as compact JSON.
+
+    orjson is used when installed; the stdlib fallback uses the same
+    separators and non-ASCII handling so the prompt text (and therefore the
+    LLM cache key) is identical either way.
+
+    :param data: JSON-compatible example data
+    :type data: Any
+    :return: Compact JSON text
+    :rtype: str
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+# Few-shot examples rendered once; the example JSON goes through _compact_json
+# (orjson, or json.dumps with matching compact separators) so the model sees
+# real JSON (null/true/false, double quotes) without indentation whitespace
+FEWSHOT_BLOB = "".join(
+    f"\n### Example help:\n{ex['help_text']}\n### Example JSON:\n{_compact_json(ex['json'])}\n" for ex in FEWSHOT
+)
@@ -1,13 +1,22 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, ValidationError
 from .schema import CommandDoc
-from .llm_parser import _build_model
+from ..constants import DEFAULT_BATCH_TOKEN_BUDGET, DEFAULT_PARSE_BATCH_SIZE, ESTIMATE_HELP_HEAD_CHARS, ESTIMATE_HELP_TAIL_CHARS
+from .cache import _hash_help
+from .llm_parser import _chunk_by_tokens, _structured_model
 
 class ResourceEstimate(BaseModel):
     cpu: int = Field(ge=1, description="CPU cores")
     mem_gb: float = Field(gt=0, description="RAM in GB")
 
+class CommandEstimate(ResourceEstimate):
+    path: str = Field(description="command_path of the block this estimate is for")
+
+class ResourceEstimateBatch(BaseModel):
+    """Resource estimates for several commands from one multi-command prompt."""
+    estimates: List[CommandEstimate] = Field(default_factory=list)
+
 SYSTEM = """Estimate typical resources to run a CLI subcommand.
 Rules:
 - Return JSON with fields {cpu:int, mem_gb:float}.
@@ -16,13 +25,66 @@ Rules:
 - If memory heavy, increase mem_gb.
 """
 
+BATCH_SYSTEM = SYSTEM + """
+Multiple commands:
+- The user message contains several blocks starting with `---`, each with command_path and help_text.
+- Estimate every block independently and return one entry per block in `estimates`,
+  with `path` set exactly to that block's command_path.
+"""
+
+# Estimates per (model settings, normalized help hash), shared across subcommands
+_ESTIMATES: Dict[tuple, ResourceEstimate] = {}
+
+def _trim_help(text: str, head: int = ESTIMATE_HELP_HEAD_CHARS, tail: int = ESTIMATE_HELP_TAIL_CHARS) -> str:
+    """
+    Shorten long help text to its head and tail for resource estimation.
+
+    The description, usage and first options (threads, memory) sit at the
+    top and notes or examples at the bottom; the long option listing in
+    between rarely changes the estimate but dominates the prompt tokens.
+
+    :param text: Help text
+    :type text: str
+    :param head: Number of leading characters to keep
+    :type head: int
+    :param tail: Number of trailing characters to keep
+    :type tail: int
+    :return: The text itself if short enough, else head and tail with an elision marker
+    :rtype: str
+    """
+    if len(text) <= head + tail:
+        return text
+    return f"{text[:head]}\n...[truncated {len(text) - head - tail} chars]...\n{text[-tail:]}"
+
+def _estimate_key(doc: CommandDoc, model_name: str, provider: str, temperature: float) -> tuple:
+    """
+    Build the memo key for a command's resource estimate.
+
+    :param doc: Command documentation with help text
+    :type doc: CommandDoc
+    :param model_name: Model name to use for estimation
+    :type model_name: str
+    :param provider: LLM provider ('ollama' or 'google')
+    :type provider: str
+    :param temperature: Model temperature
+    :type temperature: float
+    :return: Key into the estimate memo
+    :rtype: tuple
+    """
+    return (model_name, provider, temperature, _hash_help(doc.help_text) if doc.help_text.strip() else doc.path)
+
 def estimate_resources(doc: CommandDoc, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None) -> ResourceEstimate:
     """
     Estimate CPU and memory requirements for a command using an LLM.
 
     Analyzes the command's help text and purpose to provide conservative
     resource estimates. Falls back to default values (1 CPU, 2GB RAM) on
-    parsing failure.
+    parsing failure. Long help text is cut to its head and tail (see
+    :func:`_trim_help`). The structured-output binding is shared with the
+    parser cache, so estimating many subcommands builds the schema only once.
+    Estimates are memoized per process by the hash of the normalized help
+    text, so subcommands printing the same help (aliases, reruns) skip the
+    LLM call; commands without help text are keyed by their path instead.
 
     :param doc: Command documentation with help text
     :type doc: CommandDoc
@@ -37,13 +99,76 @@ def estimate_resources(doc: CommandDoc, model_name: str, provider: str = "ollama
     :return: Resource estimate with CPU cores and memory in GB
     :rtype: ResourceEstimate
     """
-    model = _build_model(model_name, provider, temperature, google_api_key)
-    structured = model.with_structured_output(ResourceEstimate)
-    user = f"command_path: {doc.path}\n\nhelp_text:\n{doc.help_text}\n"
+    key = _estimate_key(doc, model_name, provider, temperature)
+    cached = _ESTIMATES.get(key)
+    if cached is not None:
+        return cached.model_copy()
+    structured = _structured_model(model_name, provider, temperature, google_api_key, ResourceEstimate)
+    user = f"command_path: {doc.path}\n\nhelp_text:\n{_trim_help(doc.help_text)}\n"
     try:
-        return structured.invoke([
+        est = structured.invoke([
             {"role": "system", "content": SYSTEM},
             {"role": "user", "content": user}
         ])
     except ValidationError:
-        return ResourceEstimate(cpu=1, mem_gb=2.0)
+        return ResourceEstimate.model_construct(cpu=1, mem_gb=2.0)
+    _ESTIMATES[key] = est
+    return est.model_copy()
+
+def estimate_resources_batch(docs: List[CommandDoc], model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, concurrency: int = 1, batch_size: int = DEFAULT_PARSE_BATCH_SIZE) -> List[ResourceEstimate]:
+    """
+    Estimate resources for several commands with as few LLM requests as possible.
+
+    Commands already in the estimate memo, or sharing normalized help text
+    with an earlier command, are not sent again. The rest are grouped into
+    chunks of up to ``batch_size`` commands and ``DEFAULT_BATCH_TOKEN_BUDGET``
+    estimated tokens, each sent as one multi-command prompt. Commands missing
+    from a chunk's response, or whose chunk failed validation, fall back to
+    :func:`estimate_resources`.
+
+    :param docs: Command documentation objects
+    :type docs: List[CommandDoc]
+    :param model_name: Model name to use for estimation
+    :type model_name: str
+    :param provider: LLM provider ('ollama' or 'google')
+    :type provider: str
+    :param temperature: Model temperature (0.0 = deterministic)
+    :type temperature: float
+    :param google_api_key: Google API key (required for Google provider)
+    :type google_api_key: Optional[str]
+    :param concurrency: Maximum number of in-flight LLM requests
+    :type concurrency: int
+    :param batch_size: Maximum number of commands per LLM request
+    :type batch_size: int
+    :return: Resource estimates, in the same order as ``docs``
+    :rtype: List[ResourceEstimate]
+    """
+    keys = [_estimate_key(d, model_name, provider, temperature) for d in docs]
+    first: Dict[tuple, int] = {}
+    for i, key in enumerate(keys):
+        if key not in _ESTIMATES:
+            first.setdefault(key, i)
+    if first:
+        misses = list(first.values())
+        chunks = _chunk_by_tokens(misses, [len(_trim_help(docs[i].help_text)) // 4 + 64 for i in misses], batch_size, DEFAULT_BATCH_TOKEN_BUDGET)
+        structured = _structured_model(model_name, provider, temperature, google_api_key, ResourceEstimateBatch)
+        prompts = [
+            [
+                {"role": "system", "content": BATCH_SYSTEM},
+                {"role": "user", "content": "".join(
+                    f"---\ncommand_path: {docs[i].path}\n\nhelp_text:\n{_trim_help(docs[i].help_text)}\n" for i in chunk
+                )},
+            ]
+            for chunk in chunks
+        ]
+        outputs = structured.batch_as_completed(prompts, config={"max_concurrency": max(1, concurrency)}, return_exceptions=True)
+        for n, out in outputs:
+            if isinstance(out, Exception) and not isinstance(out, ValidationError):
+                raise out
+            by_path = {e.path: e for e in out.estimates} if isinstance(out, ResourceEstimateBatch) else {}
+            for i in chunks[n]:
+                est = by_path.get(docs[i].path)
+                if est is not None:
+                    # Fields were validated as part of the batch response
+                    _ESTIMATES[keys[i]] = ResourceEstimate.model_construct(cpu=est.cpu, mem_gb=est.mem_gb)
+    return [estimate_resources(d, model_name, provider, temperature, google_api_key) for d in docs]
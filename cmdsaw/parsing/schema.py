@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Literal, Optional, List
+from typing import Any, Literal, Optional, List
 from pydantic import BaseModel, Field
 
 ScalarType = Literal["int","float","str","path","bool","choice","unknown"]
@@ -46,6 +46,10 @@ class CommandDoc(BaseModel):
     requires_subcommand: bool = False
     supports_piped_output: bool = False
 
+class CommandDocBatch(BaseModel):
+    """Several command nodes parsed from one multi-command prompt."""
+    docs: List[CommandDoc] = Field(default_factory=list)
+
 class ToolDoc(BaseModel):
     command: str
     version: Optional[str] = None
@@ -58,6 +62,15 @@ class ToolDoc(BaseModel):
     container_info: Optional["ContainerInfo"] = None
     supports_piped_output: bool = False
 
+class CmdSawPatch(BaseModel):
+    """Replacement of one value inside a CmdSawResult, addressed by a dotted path."""
+    path: str = Field(..., description="Dotted path with list indices (e.g., 'tool.options[3].description')")
+    new_value: Any = Field(None, description="Complete replacement value at that path")
+
+class CmdSawPatchSet(BaseModel):
+    """Targeted edits returned by the LLM fix step."""
+    patches: List[CmdSawPatch] = Field(default_factory=list)
+
 class ParseDiagnostics(BaseModel):
     warnings: List[str] = Field(default_factory=list)
     timeouts: int = 0
@@ -75,6 +88,9 @@ class CmdSawResult(BaseModel):
     tool: ToolDoc
     diagnostics: ParseDiagnostics
 
+# Characters replaced with "_" in generated output filenames
+_SAFE_NAME_TABLE = str.maketrans({" ": "_", "/": "_", "-": "_"})
+
 def generate_piped_output_filename(command_path: str, file_format: Optional[FileFormat] = None) -> str:
     """
     Generate a default output filename for piped output.
@@ -93,7 +109,7 @@ def generate_piped_output_filename(command_path: str, file_format: Optional[File
         'grep_output.txt'
     """
     # Convert command path to valid filename
-    safe_name = command_path.replace(" ", "_").replace("/", "_").replace("-", "_")
+    safe_name = command_path.translate(_SAFE_NAME_TABLE)
     
     # Determine extension
     if file_format and file_format.extension:
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import re
+from typing import List, Optional, Tuple
+from .schema import CommandDoc, FileFormat, OptionDoc, PositionalDoc
+
+# Help footers that identify the generating framework unambiguously
+_ARGPARSE_HELP_RE = re.compile(r"^\s*-h, --help\s+show this help message and exit\s*$", re.M)
+_CLICK_HELP_RE = re.compile(r"^\s*--help\s+Show this message and exit\.\s*$", re.M)
+
+_SECTION_RE = re.compile(r"^(\S[^:\n]*):\s*$", re.M)
+_USAGE_RE = re.compile(r"^usage:\s*(.+?)(?=\n\s*\n|\Z)", re.I | re.M | re.S)
+_ENTRY_RE = re.compile(r"^  (\S.*?)(?:\s{2,}(\S.*))?$")
+_DEFAULT_RE = re.compile(r"[(\[]default:\s*([^)\]]*)[)\]]")
+_CHOICES_RE = re.compile(r"^\{([^}]*)\}$|^\[([^\]]*\|[^\]]*)\]$")
+_EXTENSION_RE = re.compile(r"(\.(?:fasta|fa|fastq|fq|bam|sam|cram|vcf|bcf|bed|gff3?|gtf|csv|tsv|json|xml|txt))\b", re.I)
+
+_TYPE_BY_METAVAR = {
+    "INT": "int", "INTEGER": "int", "N": "int", "NUM": "int",
+    "FLOAT": "float",
+    "PATH": "path", "FILE": "path", "FILENAME": "path", "DIR": "path", "DIRECTORY": "path",
+    "TEXT": "str", "STR": "str", "STRING": "str",
+}
+_OUTPUT_WORDS = ("output", "write", "save", "destination", "result")
+_INPUT_WORDS = ("input", "source", "read", "load")
+_SKIP_OPTIONS = {"--help", "--version"}
+
+def _sections(help_text: str) -> dict[str, List[str]]:
+    """
+    Split help text into its ``Heading:`` sections.
+
+    :param help_text: Raw help text
+    :type help_text: str
+    :return: Mapping of lowercased heading to the lines under it
+    :rtype: dict[str, List[str]]
+    """
+    out: dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in help_text.splitlines():
+        m = _SECTION_RE.match(line)
+        if m:
+            current = out.setdefault(m.group(1).strip().lower(), [])
+        elif current is not None:
+            current.append(line)
+    return out
+
+def _entries(lines: List[str]) -> List[Tuple[str, str]]:
+    """
+    Group a section's lines into (term, description) entries.
+
+    Terms start at two spaces of indentation; deeper-indented lines continue
+    the previous entry's description.
+
+    :param lines: Lines of one help section
+    :type lines: List[str]
+    :return: List of (term, description) pairs
+    :rtype: List[Tuple[str, str]]
+    """
+    entries: List[List[str]] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        m = _ENTRY_RE.match(line)
+        if m and not line.startswith("   "):
+            entries.append([m.group(1).strip(), (m.group(2) or "").strip()])
+        elif entries:
+            entries[-1][1] = f"{entries[-1][1]} {line.strip()}".strip()
+    return [(term, desc) for term, desc in entries]
+
+def _classify(name: str, description: str, scalar: str) -> Tuple[str, Optional[FileFormat]]:
+    """
+    Infer file role and format for a path-typed parameter from its wording.
+
+    :param name: Parameter name or flag
+    :type name: str
+    :param description: Parameter description
+    :type description: str
+    :param scalar: Inferred scalar type
+    :type scalar: str
+    :return: Tuple of (file_role, file_format)
+    :rtype: Tuple[str, Optional[FileFormat]]
+    """
+    if scalar != "path":
+        return "none", None
+    text = f"{name} {description}".lower()
+    if any(w in text for w in _OUTPUT_WORDS):
+        role = "output"
+    elif any(w in text for w in _INPUT_WORDS):
+        role = "input"
+    else:
+        return "none", None
+    m = _EXTENSION_RE.search(description)
+    return role, (FileFormat(extension=m.group(1).lower()) if m else None)
+
+def _parse_option(term: str, description: str) -> Optional[OptionDoc]:
+    """
+    Build an OptionDoc from an option term such as ``-o, --output FILE``.
+
+    :param term: Option term column
+    :type term: str
+    :param description: Option description column
+    :type description: str
+    :return: Parsed option, or None for --help/--version
+    :rtype: Optional[OptionDoc]
+    """
+    short = long = metavar = None
+    for alias in term.split(", "):
+        flag, _, value = alias.replace("=", " ", 1).partition(" ")
+        if flag.startswith("--"):
+            long = long or flag
+        elif flag.startswith("-"):
+            short = short or flag
+        metavar = metavar or value.strip() or None
+    if long in _SKIP_OPTIONS or (long is None and short is None):
+        return None
+    choices = None
+    if metavar is None:
+        scalar = "bool"
+    elif (m := _CHOICES_RE.match(metavar)):
+        scalar = "choice"
+        choices = [c.strip() for c in re.split(r"[,|]", m.group(1) or m.group(2))]
+    else:
+        scalar = _TYPE_BY_METAVAR.get(metavar.upper(), "str")
+    default = _DEFAULT_RE.search(description)
+    role, fmt = _classify(long or short, description, scalar)
+    return OptionDoc(
+        long=long,
+        short=short,
+        is_flag=metavar is None,
+        type=scalar,
+        choices=choices,
+        required="[required]" in description,
+        default=default.group(1).strip() if default else None,
+        description=description or None,
+        file_role=role,
+        file_format=fmt,
+    )
+
+def _usage_positionals(usage: str, command_path: str) -> List[Tuple[str, bool, bool]]:
+    """
+    Read positional arguments from a click-style usage line.
+
+    :param usage: Usage line without the ``Usage:`` prefix
+    :type usage: str
+    :param command_path: Full command path
+    :type command_path: str
+    :return: List of (name, required, variadic)
+    :rtype: List[Tuple[str, bool, bool]]
+    """
+    out = []
+    for token in usage.split()[len(command_path.split()):]:
+        bare = token.rstrip(".").strip("[]")
+        if not bare.isupper() or bare in ("OPTIONS", "COMMAND", "ARGS"):
+            continue
+        out.append((bare, not token.startswith("["), token.endswith("...")))
+    return out
+
+def try_template_parse(command_path: str, help_text: str) -> Optional[CommandDoc]:
+    """
+    Parse argparse or click generated help text without an LLM.
+
+    Only help text carrying the framework's standard ``--help`` line is
+    accepted; anything else returns None so the caller can fall back to the
+    LLM parser. Types come from metavars and file roles from the same
+    wording cues the LLM prompt describes.
+
+    :param command_path: Full command path (e.g., "tool sort")
+    :type command_path: str
+    :param help_text: Raw help text output from the command
+    :type help_text: str
+    :return: Parsed command documentation, or None if no template matched
+    :rtype: Optional[CommandDoc]
+    """
+    is_argparse = bool(_ARGPARSE_HELP_RE.search(help_text))
+    if not is_argparse and not _CLICK_HELP_RE.search(help_text):
+        return None
+    usage_match = _USAGE_RE.search(help_text)
+    if not usage_match:
+        return None
+    usage = " ".join(usage_match.group(1).split())
+    sections = _sections(help_text)
+
+    options = []
+    for heading in ("options", "optional arguments"):
+        for term, desc in _entries(sections.get(heading, [])):
+            if term.startswith("-") and (opt := _parse_option(term, desc)):
+                options.append(opt)
+
+    positionals: List[PositionalDoc] = []
+    subcommands: List[str] = []
+    if is_argparse:
+        for term, desc in _entries(sections.get("positional arguments", [])):
+            if term.startswith("{"):
+                subcommands = [s.strip() for s in term.strip("{}").split(",")]
+                continue
+            scalar = "path" if _classify(term, desc, "path")[0] != "none" else "str"
+            role, fmt = _classify(term, desc, scalar)
+            positionals.append(PositionalDoc(
+                name=term,
+                index=len(positionals),
+                variadic=f"{term} ..." in usage,
+                required=f"[{term}" not in usage,
+                type=scalar,
+                description=desc or None,
+                file_role=role,
+                file_format=fmt,
+            ))
+        requires_subcommand = bool(subcommands) and re.search(r"(?<!\[)\{", usage) is not None
+    else:
+        subcommands = [term.split()[0] for term, _ in _entries(sections.get("commands", []))]
+        for name, required, variadic in _usage_positionals(usage, command_path):
+            scalar = "path" if _classify(name, "", "path")[0] != "none" else "str"
+            role, fmt = _classify(name, "", scalar)
+            positionals.append(PositionalDoc(
+                name=name.lower(),
+                index=len(positionals),
+                variadic=variadic,
+                required=required,
+                type=scalar,
+                file_role=role,
+                file_format=fmt,
+            ))
+        requires_subcommand = "COMMAND" in usage.split()
+
+    return CommandDoc(
+        name=command_path.split()[-1],
+        path=command_path,
+        help_text=help_text,
+        options=options,
+        positionals=positionals,
+        subcommands=subcommands,
+        requires_subcommand=requires_subcommand,
+    )
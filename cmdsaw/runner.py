@@ -1,15 +1,111 @@
 from __future__ import annotations
-from datetime import datetime
-from typing import Iterable, Mapping, Optional
-from .constants import HELP_FLAG_CANDIDATES, VERSION_FLAG_CANDIDATES, DEFAULT_TIMEOUT
-from .utils import run_capture, extract_version_number
+import asyncio, time
+from typing import Callable, Iterable, Mapping, Optional, TypeVar
+from .constants import HELP_FLAG_CANDIDATES, VERSION_FLAG_CANDIDATES, DEFAULT_TIMEOUT, HELP_IDLE_TIMEOUT
+from .utils import run_capture_async, extract_version_number
+
+# Lines of version output searched for a version number
+_VERSION_SCAN_LINES = 5
+
+T = TypeVar("T")
+
+# Zero-padded two-digit fields for now_iso (month, day, hour, minute, second)
+_D2 = [f"{i:02d}" for i in range(62)]
+
+# Last formatted timestamp; now_iso reuses it within the same second
+_last_iso: tuple[int, str] = (-1, "")
+
+def _flag_cmdlines(command_path: list[str], flags: Iterable[str]) -> list[list[str]]:
+    """
+    Build the argv for each flag attempt, in priority order.
+
+    :param command_path: Command and any subcommands as a list of strings
+    :type command_path: list[str]
+    :param flags: Flags to try, one per attempt
+    :type flags: Iterable[str]
+    :return: One command line per flag
+    :rtype: list[list[str]]
+    """
+    return [[*command_path, flag] for flag in flags]
+
+async def _first_accepted(cmdlines: list[list[str]], accept: Callable[[str, int], Optional[T]], *, timeout: int, env: Mapping[str,str] | None, cwd: str | None, idle_timeout: float | None = None) -> Optional[T]:
+    """
+    Run command lines in order and return the first accepted result.
+
+    Each command line starts only after the previous one was rejected:
+    short flags such as ``-v`` often mean something else (verbose, or start
+    real work), so they must not run once the long form already answered.
+
+    :param cmdlines: Command lines to run, in priority order
+    :type cmdlines: list[list[str]]
+    :param accept: Maps (output, exit code) to a result, or None to try the next command line
+    :type accept: Callable[[str, int], Optional[T]]
+    :param timeout: Maximum time in seconds to wait for each attempt
+    :type timeout: int
+    :param env: Optional environment variables to set
+    :type env: Mapping[str,str] | None
+    :param cwd: Optional working directory for command execution
+    :type cwd: str | None
+    :param idle_timeout: Optional quiet period after which help output counts as complete
+    :type idle_timeout: float | None
+    :return: First accepted result, or None
+    :rtype: Optional[T]
+    """
+    for cmdline in cmdlines:
+        result = accept(*await run_capture_async(cmdline, timeout=timeout, env=env, cwd=cwd, idle_timeout=idle_timeout))
+        if result is not None:
+            return result
+    return None
+
+def _version_from_output(out: str, code: int) -> str | None:
+    """
+    Find a version number in the first lines of version flag output.
+
+    :param out: Captured output
+    :type out: str
+    :param code: Exit code (unused; many tools exit non-zero for --version)
+    :type code: int
+    :return: Extracted version number, or None
+    :rtype: str | None
+    """
+    for line in out.splitlines()[:_VERSION_SCAN_LINES]:
+        v = extract_version_number(line)
+        if v:
+            return v
+    return None
 
 def try_help(command_path: list[str], help_flags: Iterable[str], *, timeout: int, env: Mapping[str,str] | None, cwd: str | None) -> tuple[str,int]:
     """
     Try multiple help flags to capture command help text.
 
-    Iterates through provided help flags (e.g., --help, -h, help) and runs the
-    command with each flag until output is obtained.
+    Runs the command with each provided help flag (e.g., --help, -h, help)
+    in turn until one produces output. Synchronous wrapper around
+    :func:`try_help_async`.
+
+    :param command_path: Command and any subcommands as a list of strings
+    :type command_path: list[str]
+    :param help_flags: Iterable of help flag strings to try
+    :type help_flags: Iterable[str]
+    :param timeout: Maximum time in seconds to wait for each attempt
+    :type timeout: int
+    :param env: Optional environment variables to set
+    :type env: Mapping[str,str] | None
+    :param cwd: Optional working directory for command execution
+    :type cwd: str | None
+    :return: Tuple of (help text, exit code)
+    :rtype: tuple[str,int]
+    """
+    return asyncio.run(try_help_async(command_path, help_flags, timeout=timeout, env=env, cwd=cwd))
+
+async def try_help_async(command_path: list[str], help_flags: Iterable[str], *, timeout: int, env: Mapping[str,str] | None, cwd: str | None) -> tuple[str,int]:
+    """
+    Asynchronously try multiple help flags to capture command help text.
+
+    Same behavior as :func:`try_help`, using :func:`run_capture_async` so
+    help for many subcommands can be captured concurrently on one event
+    loop. A tool that prints its help and then waits (e.g. on a pager) is
+    stopped after ``HELP_IDLE_TIMEOUT`` seconds of silence instead of
+    running into ``timeout``.
 
     :param command_path: Command and any subcommands as a list of strings
     :type command_path: list[str]
@@ -25,22 +121,40 @@ def try_help(command_path: list[str], help_flags: Iterable[str], *, timeout: int
     :rtype: tuple[str,int]
     """
     print(f"Invoking help for: {' '.join(command_path)}")
-    for hf in help_flags:
-        if hf == "help":
-            cmdline = command_path + ["help"]
-        else:
-            cmdline = command_path + [hf]
-        out, code = run_capture(cmdline, timeout=timeout, env=env, cwd=cwd)
-        if out:
-            return out, code
-    return "", 1
+    found = await _first_accepted(
+        _flag_cmdlines(command_path, help_flags),
+        lambda out, code: (out, code) if out else None,
+        timeout=timeout, env=env, cwd=cwd, idle_timeout=HELP_IDLE_TIMEOUT,
+    )
+    return found or ("", 1)
 
 def try_version(command_path: list[str], *, timeout: int, env: Mapping[str,str] | None, cwd: str | None) -> str | None:
     """
     Try to extract the version number from a command.
 
-    Attempts multiple version flags (--version, -v) and extracts version
-    information from the first line of output.
+    Synchronous wrapper around :func:`try_version_async`.
+
+    :param command_path: Command and any subcommands as a list of strings
+    :type command_path: list[str]
+    :param timeout: Maximum time in seconds to wait for each attempt
+    :type timeout: int
+    :param env: Optional environment variables to set
+    :type env: Mapping[str,str] | None
+    :param cwd: Optional working directory for command execution
+    :type cwd: str | None
+    :return: Extracted version number, or None if not found
+    :rtype: str | None
+    """
+    return asyncio.run(try_version_async(command_path, timeout=timeout, env=env, cwd=cwd))
+
+async def try_version_async(command_path: list[str], *, timeout: int, env: Mapping[str,str] | None, cwd: str | None) -> str | None:
+    """
+    Asynchronously try to extract the version number from a command.
+
+    Tries the version flags (--version, then -v) in turn and extracts version
+    information from the first few lines of output, since some tools print
+    a usage or banner line before the version. ``-v`` only runs if
+    ``--version`` gave no version, as many tools treat it as "verbose".
 
     :param command_path: Command and any subcommands as a list of strings
     :type command_path: list[str]
@@ -54,14 +168,10 @@ def try_version(command_path: list[str], *, timeout: int, env: Mapping[str,str]
     :rtype: str | None
     """
     print(f"Checking version for: {' '.join(command_path)}")
-    for vf in VERSION_FLAG_CANDIDATES:
-        cmdline = command_path + [vf]
-        out, _ = run_capture(cmdline, timeout=timeout, env=env, cwd=cwd)
-        if out:
-            v = extract_version_number(out.splitlines()[0])
-            if v:
-                print(f"  Found version: {v}")
-                return v
+    v = await _first_accepted(_flag_cmdlines(command_path, VERSION_FLAG_CANDIDATES), _version_from_output, timeout=timeout, env=env, cwd=cwd)
+    if v:
+        print(f"  Found version: {v}")
+        return v
     print(f"  No version found")
     return None
 
@@ -69,7 +179,16 @@ def now_iso() -> str:
     """
     Get the current UTC time as an ISO 8601 string.
 
+    Timestamps have one-second resolution, so the formatted string is
+    memoized until the second changes. Fields are assembled from a table of
+    two-digit strings rather than going through ``strftime``.
+
     :return: Current UTC timestamp in ISO 8601 format with 'Z' suffix
     :rtype: str
     """
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    global _last_iso
+    sec = int(time.time())
+    if _last_iso[0] != sec:
+        g = time.gmtime(sec)
+        _last_iso = (sec, f"{g.tm_year}-{_D2[g.tm_mon]}-{_D2[g.tm_mday]}T{_D2[g.tm_hour]}:{_D2[g.tm_min]}:{_D2[g.tm_sec]}Z")
+    return _last_iso[1]
@@ -1,7 +1,69 @@
 from __future__ import annotations
 import json
+import os
+from typing import Any
 from .parsing.schema import CmdSawResult
 
+try:
+    import orjson
+except ImportError:  # optional speedup, installed with the "fast" extra
+    orjson = None
+
+def _use_orjson() -> bool:
+    """
+    Check whether the orjson encoder should be used.
+
+    orjson is used when installed unless ``CMDSAW_JSON=stdlib`` is set, which
+    forces the standard library encoder (useful for debugging).
+
+    :return: True if orjson should be used
+    :rtype: bool
+    """
+    return orjson is not None and os.environ.get("CMDSAW_JSON", "").lower() != "stdlib"
+
+def dumps_bytes(data: Any) -> bytes:
+    """
+    Encode JSON-compatible data as pretty-printed UTF-8 JSON bytes.
+
+    :param data: Dicts, lists and scalars to encode
+    :type data: Any
+    :return: JSON document with 2-space indentation
+    :rtype: bytes
+    """
+    if _use_orjson():
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+def loads_bytes(raw: bytes) -> Any:
+    """
+    Decode UTF-8 JSON bytes.
+
+    :param raw: JSON document
+    :type raw: bytes
+    :return: Decoded data
+    :rtype: Any
+    """
+    if _use_orjson():
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _dumps_bytes(result: CmdSawResult) -> bytes:
+    """
+    Encode a CmdSawResult as pretty-printed UTF-8 JSON bytes.
+
+    Without orjson, pydantic's native ``model_dump_json`` serializes the model
+    in a single pass instead of building a dict for ``json.dumps``; all
+    encoders produce the same document.
+
+    :param result: The parsed command result to serialize
+    :type result: CmdSawResult
+    :return: JSON document with 2-space indentation
+    :rtype: bytes
+    """
+    if orjson is None:
+        return result.model_dump_json(indent=2).encode("utf-8")
+    return dumps_bytes(result.model_dump(mode="json"))
+
 def to_json(result: CmdSawResult) -> str:
     """
     Convert a CmdSawResult to a JSON string.
@@ -11,12 +73,14 @@ def to_json(result: CmdSawResult) -> str:
     :return: Pretty-printed JSON string with 2-space indentation
     :rtype: str
     """
-    return json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
+    return _dumps_bytes(result).decode("utf-8")
 
 def write_json(path: str, result: CmdSawResult) -> None:
     """
     Write a CmdSawResult to a JSON file.
 
+    The encoded bytes are written directly, without an intermediate str.
+
     :param path: File path where JSON will be written
     :type path: str
     :param result: The parsed command result to serialize
@@ -24,5 +88,5 @@ def write_json(path: str, result: CmdSawResult) -> None:
     :return: None
     :rtype: None
     """
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(to_json(result))
+    with open(path, "wb") as f:
+        f.write(_dumps_bytes(result))
@@ -1,9 +1,12 @@
 from __future__ import annotations
-import os, re, shutil, subprocess
+import asyncio, contextlib, os, re, shutil, subprocess, threading
 from typing import Mapping, Sequence
+from .errors import CommandNotFound
 
 ANSI_RE = re.compile(r"\x1b\[[0-9;]*[mK]")
 _VERSION_RX = re.compile(r"(\d+\.\d+(?:\.\d+){0,2}(?:[-+A-Za-z0-9.]*)?)")
+# Output that looks like complete help; see _communicate_until_idle
+_HELP_MARKER_RE = re.compile(rb"usage:|options:", re.I)
 
 def which_or_raise(cmd: str) -> str:
     """
@@ -17,7 +20,6 @@ def which_or_raise(cmd: str) -> str:
     """
     path = shutil.which(cmd)
     if not path:
-        from .errors import CommandNotFound
         raise CommandNotFound(cmd)
     return path
 
@@ -32,12 +34,68 @@ def strip_ansi(s: str) -> str:
     """
     return ANSI_RE.sub("", s)
 
+def write_atomic(path: str, raw: bytes) -> None:
+    """
+    Write bytes to a file atomically via a temp file and ``os.replace``.
+
+    Readers never see a partially written file, even if the process dies
+    mid-write. If the write fails, the temp file is removed and the error is
+    re-raised.
+
+    :param path: Destination file path
+    :type path: str
+    :param raw: Bytes to write
+    :type raw: bytes
+    :return: None
+    :rtype: None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+def _capture_env(env: Mapping[str, str] | None) -> dict[str, str]:
+    """
+    Build the environment for help/version captures.
+
+    :param env: Optional additional environment variables to set
+    :type env: Mapping[str, str] | None
+    :return: Copy of the current environment with pagers disabled and overrides applied
+    :rtype: dict[str, str]
+    """
+    base_env = os.environ.copy()
+    base_env.update({"PAGER":"cat","MANPAGER":"cat","LC_ALL":"C"})
+    if env: base_env.update(dict(env))
+    return base_env
+
+def _combine_output(stdout: str, stderr: str) -> str:
+    """
+    Merge captured streams, falling back to stderr when stdout is empty.
+
+    :param stdout: Captured standard output
+    :type stdout: str
+    :param stderr: Captured standard error
+    :type stderr: str
+    :return: Combined output with ANSI escape codes removed
+    :rtype: str
+    """
+    out = (stdout or "") + ("\n" + stderr if stderr and not stdout else "")
+    return strip_ansi(out).strip()
+
 def run_capture(cmdline: Sequence[str], timeout: int, env: Mapping[str, str] | None = None, cwd: str | None = None) -> tuple[str, int]:
     """
     Run a command and capture its output with timeout.
 
     Executes a command with modified environment variables (disabling pagers),
     captures both stdout and stderr, and strips ANSI escape codes from the output.
+    stdin is /dev/null, so a tool that ignores the flag and reads its input
+    sees EOF instead of hanging until the timeout.
 
     :param cmdline: Command and arguments as a sequence of strings
     :type cmdline: Sequence[str]
@@ -50,21 +108,126 @@ def run_capture(cmdline: Sequence[str], timeout: int, env: Mapping[str, str] | N
     :return: Tuple of (output string, return code)
     :rtype: tuple[str, int]
     """
-    base_env = os.environ.copy()
-    base_env.update({"PAGER":"cat","MANPAGER":"cat","LC_ALL":"C"})
-    if env: base_env.update(dict(env))
     proc = subprocess.run(
         list(cmdline),
+        stdin=subprocess.DEVNULL,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         cwd=cwd,
-        env=base_env,
+        env=_capture_env(env),
         timeout=timeout,
         shell=False,
         text=True,
     )
-    out = (proc.stdout or "") + ("\n" + proc.stderr if proc.stderr and not proc.stdout else "")
-    return strip_ansi(out).strip(), proc.returncode
+    return _combine_output(proc.stdout, proc.stderr), proc.returncode
+
+async def _drain(stream: asyncio.StreamReader, buf: bytearray) -> None:
+    """
+    Read a stream to EOF, appending each chunk to ``buf`` as it arrives.
+
+    :param stream: Subprocess output stream
+    :type stream: asyncio.StreamReader
+    :param buf: Buffer collecting the output
+    :type buf: bytearray
+    :return: None
+    :rtype: None
+    """
+    while chunk := await stream.read(65536):
+        buf.extend(chunk)
+
+async def _communicate_until_idle(proc: asyncio.subprocess.Process, timeout: float, idle_timeout: float) -> tuple[bytes, bytes]:
+    """
+    Collect a process's output, stopping early once it printed help and went quiet.
+
+    Some tools print their help and then sit waiting on stdin or a pager
+    instead of exiting. Once the output contains a ``usage:``/``options:``
+    marker and no new bytes arrived for ``idle_timeout`` seconds, the process
+    is killed and the output so far returned, instead of waiting for the
+    full timeout.
+
+    :param proc: Process started with piped stdout and stderr
+    :type proc: asyncio.subprocess.Process
+    :param timeout: Maximum time in seconds to wait overall
+    :type timeout: float
+    :param idle_timeout: Quiet period in seconds after which help output counts as complete
+    :type idle_timeout: float
+    :return: Tuple of (stdout, stderr) bytes
+    :rtype: tuple[bytes, bytes]
+    :raises asyncio.TimeoutError: If the process neither exits nor goes idle in time
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    stdout, stderr = bytearray(), bytearray()
+    readers = asyncio.gather(_drain(proc.stdout, stdout), _drain(proc.stderr, stderr))
+    seen = -1
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                await asyncio.wait_for(asyncio.shield(readers), min(idle_timeout, remaining))
+                break
+            except asyncio.TimeoutError:
+                size = len(stdout) + len(stderr)
+                if size == seen and (_HELP_MARKER_RE.search(stdout) or _HELP_MARKER_RE.search(stderr)):
+                    with contextlib.suppress(ProcessLookupError):
+                        proc.kill()
+                    break
+                seen = size
+    finally:
+        readers.cancel()
+        await asyncio.gather(readers, return_exceptions=True)
+    await proc.wait()
+    return bytes(stdout), bytes(stderr)
+
+async def run_capture_async(cmdline: Sequence[str], timeout: int, env: Mapping[str, str] | None = None, cwd: str | None = None, idle_timeout: float | None = None) -> tuple[str, int]:
+    """
+    Asynchronously run a command and capture its output with timeout.
+
+    Event-loop counterpart of :func:`run_capture`, so many captures can be in
+    flight without holding one OS thread each. Output handling is identical.
+    With ``idle_timeout`` set, a command that printed help and then went
+    quiet is stopped early (see :func:`_communicate_until_idle`).
+
+    :param cmdline: Command and arguments as a sequence of strings
+    :type cmdline: Sequence[str]
+    :param timeout: Maximum time in seconds to wait for command completion
+    :type timeout: int
+    :param env: Optional additional environment variables to set
+    :type env: Mapping[str, str] | None
+    :param cwd: Optional working directory for command execution
+    :type cwd: str | None
+    :param idle_timeout: Optional quiet period in seconds after which help output counts as complete
+    :type idle_timeout: float | None
+    :return: Tuple of (output string, return code)
+    :rtype: tuple[str, int]
+    :raises subprocess.TimeoutExpired: If the command does not finish in time
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmdline,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        env=_capture_env(env),
+    )
+    try:
+        if idle_timeout is None:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        else:
+            stdout, stderr = await _communicate_until_idle(proc, timeout, idle_timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(list(cmdline), timeout)
+    except asyncio.CancelledError:
+        # Capture no longer needed (e.g. another help flag already answered)
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+        await proc.wait()
+        raise
+    return _combine_output(stdout.decode(errors="replace"), stderr.decode(errors="replace")), proc.returncode
 
 def extract_version_number(text: str) -> str | None:
     """
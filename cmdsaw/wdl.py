@@ -1,8 +1,9 @@
 from __future__ import annotations
 import re
 from typing import List, Optional
+from .constants import DEFAULT_CONCURRENCY
 from .parsing.schema import CommandDoc, OptionDoc, PositionalDoc, ContainerInfo
-from .parsing.resource_estimator import estimate_resources, ResourceEstimate
+from .parsing.resource_estimator import estimate_resources, estimate_resources_batch, ResourceEstimate
 
 def _sanitize_task_name(path: str) -> str:
     """
@@ -241,7 +242,7 @@ def _command_block(cmd: CommandDoc) -> str:
             parts.append(f'~{{if defined({var}) then {var} else ""}}')
     return " \\\n    ".join(parts)
 
-def _task_for(doc: CommandDoc, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, container_info = None) -> str:
+def _task_for(doc: CommandDoc, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, container_info = None, est: Optional[ResourceEstimate] = None) -> str:
     """
     Generate a complete WDL task definition for a command.
 
@@ -260,11 +261,14 @@ def _task_for(doc: CommandDoc, model_name: str, provider: str = "ollama", temper
     :type google_api_key: str
     :param container_info: Container information (docker, singularity, bioconda)
     :type container_info: ContainerInfo | None
+    :param est: Precomputed resource estimate; estimated with the LLM if None
+    :type est: ResourceEstimate | None
     :return: Complete WDL task definition as a string
     :rtype: str
     """
     tname = _sanitize_task_name(doc.path)
-    est = estimate_resources(doc, model_name=model_name, provider=provider, temperature=temperature, google_api_key=google_api_key)
+    if est is None:
+        est = estimate_resources(doc, model_name=model_name, provider=provider, temperature=temperature, google_api_key=google_api_key)
     inputs, metas = _inputs_block(doc, est)
     cmd_block = _command_block(doc)
     meta_block = ",\n".join(metas) if metas else ""
@@ -298,13 +302,15 @@ def _task_for(doc: CommandDoc, model_name: str, provider: str = "ollama", temper
     }}
 }}"""
 
-def emit_wdl(*, tool_name: str, docs: List[CommandDoc], out_path: str, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, container_info = None) -> None:
+def emit_wdl(*, tool_name: str, docs: List[CommandDoc], out_path: str, model_name: str, provider: str = "ollama", temperature: float = 0.0, google_api_key: Optional[str] = None, container_info = None, concurrency: int = DEFAULT_CONCURRENCY) -> None:
     """
     Write WDL task definitions for all commands to a file.
 
     Generates WDL 1.2 tasks for each command and subcommand, handling
     name collisions by appending numeric suffixes. Skips commands that
-    require subcommands and have no standalone functionality.
+    require subcommands and have no standalone functionality. Resource
+    estimates for all tasks are requested up front in multi-command LLM
+    batches (see :func:`estimate_resources_batch`).
 
     :param tool_name: Name of the root tool (unused but kept for API compatibility)
     :type tool_name: str
@@ -322,6 +328,8 @@ def emit_wdl(*, tool_name: str, docs: List[CommandDoc], out_path: str, model_nam
     :type google_api_key: str
     :param container_info: Container information (docker, singularity, bioconda)
     :type container_info: ContainerInfo | None
+    :param concurrency: Maximum number of in-flight estimation requests
+    :type concurrency: int
     :return: None
     :rtype: None
     """
@@ -339,8 +347,12 @@ def emit_wdl(*, tool_name: str, docs: List[CommandDoc], out_path: str, model_nam
     header = 'version 1.2'
     seen = set()
     tasks = []
-    for d in valid_docs:
-        t = _task_for(d, model_name=model_name, provider=provider, temperature=temperature, google_api_key=google_api_key, container_info=container_info)
+    estimates = estimate_resources_batch(valid_docs, model_name=model_name, provider=provider, temperature=temperature, google_api_key=google_api_key, concurrency=concurrency)
+    generated = [
+        _task_for(d, model_name=model_name, provider=provider, temperature=temperature, google_api_key=google_api_key, container_info=container_info, est=est)
+        for d, est in zip(valid_docs, estimates)
+    ]
+    for d, t in zip(valid_docs, generated):
         name = _sanitize_task_name(d.path)
         if name in seen:
             idx = 2
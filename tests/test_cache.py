@@ -0,0 +1,198 @@
+"""Test on-disk LLM caches."""
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+from unittest.mock import patch
+from cmdsaw.parsing.cache import LLMResponseCache, ParseCache, _hash_help, normalize_help_text
+
+
+def test_llm_response_cache_roundtrip():
+    """Test that cached chat generations are returned for the same prompt and model."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(os.path.join(tmp, "llm.db"))
+        message = AIMessage(content="", tool_calls=[{"name": "CommandDoc", "args": {"name": "ls"}, "id": "call_1"}])
+        cache.update("prompt", "model=gemma3:12b", [ChatGeneration(message=message)])
+
+        hit = cache.lookup("prompt", "model=gemma3:12b")
+        assert hit is not None
+        assert hit[0].message.tool_calls[0]["args"] == {"name": "ls"}
+
+        # Different model configuration must not hit
+        assert cache.lookup("prompt", "model=deepseek-r1:14b") is None
+
+
+def test_llm_response_cache_skips_plain_generations():
+    """Test that non-chat generations are not cached."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(os.path.join(tmp, "llm.db"))
+        cache.update("prompt", "llm", [Generation(text="plain")])
+        assert cache.lookup("prompt", "llm") is None
+
+
+def test_llm_response_cache_clear():
+    """Test that clear removes all entries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMResponseCache(os.path.join(tmp, "llm.db"))
+        cache.update("prompt", "llm", [ChatGeneration(message=AIMessage(content="hi"))])
+        cache.clear()
+        assert cache.lookup("prompt", "llm") is None
+
+
+def test_normalize_help_text_ignores_alignment():
+    """Test that whitespace-only differences normalize to the same text."""
+    a = "Usage: tool [OPTIONS]\n\n  -o, --output FILE    Output file\n"
+    b = "Usage: tool [OPTIONS]  \n\n\n\n  -o, --output FILE\tOutput file"
+    assert normalize_help_text(a) == normalize_help_text(b)
+    assert normalize_help_text(a) != normalize_help_text("Usage: tool [OPTIONS]\n  -i FILE Input file")
+
+
+def test_parse_cache_hits_on_whitespace_variants():
+    """Test that ParseCache returns entries for help text differing only in whitespace."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cache.set("tool", None, "gemma3:12b", "Usage: tool\n  -v   verbose", {"name": "tool"})
+        assert cache.get("tool", None, "gemma3:12b", "Usage: tool  \n  -v verbose\n") == {"name": "tool"}
+        assert cache.get("tool", None, "other-model", "Usage: tool\n  -v   verbose") is None
+        cache.flush()
+
+
+def test_parse_cache_reuses_identical_help_across_commands():
+    """Test that a different command with identical help reuses the parse under its own path."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cache.set("git foo", None, "gemma3:12b", "usage: git <command>", {"name": "foo", "path": "git foo", "options": []})
+        assert cache.get("git bar", None, "gemma3:12b", "usage: git <command>") == {"name": "bar", "path": "git bar", "options": []}
+        assert cache.get("git bar", None, "gemma3:12b", "usage: git bar [-v]") is None
+        cache.flush()
+
+
+def test_parse_cache_hashes_help_once_per_get_and_set():
+    """Test that a get followed by a set for the same help hashes it only once."""
+    _hash_help.cache_clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        help_text = "usage: tool [-v]\n" * 200
+        assert cache.get("tool", None, "gemma3:12b", help_text) is None
+        cache.set("tool", None, "gemma3:12b", help_text, {"name": "tool"})
+        cache.flush()
+    info = _hash_help.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
+def test_parse_cache_writes_atomically_in_background():
+    """Test that set returns before writing and leaves no temp files once flushed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cache.set("tool", None, "gemma3:12b", "usage: tool [-v]", {"name": "tool"})
+        assert len(cache._pending) == 2
+        cache.flush()
+        assert not cache._pending
+        files = [f for root, _, names in os.walk(tmp) if root != tmp for f in names]
+        assert len(files) == 2 and all(f.endswith(".json") for f in files)
+        assert ParseCache(tmp).get("tool", None, "gemma3:12b", "usage: tool [-v]") == {"name": "tool"}
+
+
+def test_parse_cache_reports_failed_writes_and_removes_temp_file():
+    """Test that a failed background write is reported and leaves no temp file behind."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        path = cache._key_path("tool", None, "gemma3:12b", _hash_help("usage: tool [-v]"))
+        # A directory where the entry should go makes the final rename fail
+        os.makedirs(path)
+        cache.set("tool", None, "gemma3:12b", "usage: tool [-v]", {"name": "tool"})
+        out = io.StringIO()
+        with redirect_stdout(out):
+            cache.flush()
+
+        assert f"failed to write cache entry {path}" in out.getvalue()
+        assert not [f for _, _, names in os.walk(tmp) for f in names if ".tmp." in f]
+
+
+def test_parse_cache_version_change_abandons_entries():
+    """Test that entries written under another cache version are not read back."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cache.set("tool", None, "gemma3:12b", "usage: tool [-v]", {"name": "tool"})
+        cache.flush()
+        with patch("cmdsaw.parsing.cache._CACHE_VERSION", 999):
+            assert cache.get("tool", None, "gemma3:12b", "usage: tool [-v]") is None
+            assert cache.get("other", None, "gemma3:12b", "usage: tool [-v]") is None
+        assert cache.get("tool", None, "gemma3:12b", "usage: tool [-v]") == {"name": "tool"}
+
+
+def test_parse_cache_drops_stale_entries_once():
+    """Test that entries from an older cache version are deleted on first open only."""
+    with tempfile.TemporaryDirectory() as tmp:
+        stale_flat = os.path.join(tmp, "0" * 32 + ".json")
+        stale_shard = os.path.join(tmp, "ab", "cd", "ab" + "0" * 30 + ".json")
+        os.makedirs(os.path.dirname(stale_shard))
+        for path in (stale_flat, stale_shard, os.path.join(tmp, "llm.db")):
+            open(path, "w").close()
+
+        cache = ParseCache(tmp)
+
+        assert sorted(os.listdir(tmp)) == ["llm.db", "parse-cache-version"]
+        cache.set("tool", None, "gemma3:12b", "usage: tool [-v]", {"name": "tool"})
+        cache.flush()
+
+        # Already at the current version: a second cache leaves entries alone
+        open(stale_flat, "w").close()
+        reopened = ParseCache(tmp)
+        assert os.path.exists(stale_flat)
+        assert reopened.get("tool", None, "gemma3:12b", "usage: tool [-v]") == {"name": "tool"}
+
+
+def test_parse_cache_treats_corrupt_entry_as_miss():
+    """Test that a truncated cache file is ignored instead of raising."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cache.set("tool", None, "gemma3:12b", "usage: tool [-v]", {"name": "tool"})
+        cache.flush()
+        for root, _, names in os.walk(tmp):
+            for name in names:
+                with open(os.path.join(root, name), "wb") as f:
+                    f.write(b'{"name": "to')
+        assert cache.get("tool", None, "gemma3:12b", "usage: tool [-v]") is None
+
+
+if __name__ == '__main__':
+    test_llm_response_cache_roundtrip()
+    print("✓ test_llm_response_cache_roundtrip passed")
+
+    test_llm_response_cache_skips_plain_generations()
+    print("✓ test_llm_response_cache_skips_plain_generations passed")
+
+    test_llm_response_cache_clear()
+    print("✓ test_llm_response_cache_clear passed")
+
+    test_normalize_help_text_ignores_alignment()
+    print("✓ test_normalize_help_text_ignores_alignment passed")
+
+    test_parse_cache_hits_on_whitespace_variants()
+    print("✓ test_parse_cache_hits_on_whitespace_variants passed")
+
+    test_parse_cache_reuses_identical_help_across_commands()
+    print("✓ test_parse_cache_reuses_identical_help_across_commands passed")
+
+    test_parse_cache_hashes_help_once_per_get_and_set()
+    print("✓ test_parse_cache_hashes_help_once_per_get_and_set passed")
+
+    test_parse_cache_writes_atomically_in_background()
+    print("✓ test_parse_cache_writes_atomically_in_background passed")
+
+    test_parse_cache_reports_failed_writes_and_removes_temp_file()
+    print("✓ test_parse_cache_reports_failed_writes_and_removes_temp_file passed")
+
+    test_parse_cache_version_change_abandons_entries()
+    print("✓ test_parse_cache_version_change_abandons_entries passed")
+
+    test_parse_cache_drops_stale_entries_once()
+    print("✓ test_parse_cache_drops_stale_entries_once passed")
+
+    test_parse_cache_treats_corrupt_entry_as_miss()
+    print("✓ test_parse_cache_treats_corrupt_entry_as_miss passed")
+
+    print("\nAll tests passed!")
@@ -1,4 +1,8 @@
 """Test container info functionality."""
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from cmdsaw.containers import request_biocontainers
 from cmdsaw.parsing.schema import CommandDoc, ToolDoc, CmdSawResult, ParseDiagnostics, ContainerInfo, OptionDoc
 from cmdsaw.wdl import _task_for
 
@@ -111,6 +115,79 @@ def test_cmdsaw_result_with_container_info():
     assert result_dict['tool']['container_info']['singularity'] == "https://depot.galaxyproject.org/singularity/samtools:1.19--h50ea8bc_1"
 
 
+def _fake_response(status_code=200, images=None, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {"ETag": etag} if etag else {}
+    response.json.return_value = {"images": images or []}
+    response.text = "error body"
+    return response
+
+
+def test_request_biocontainers_caches_successful_lookups():
+    """Test that a second lookup for the same tool version is served from disk."""
+    images = [
+        {"image_type": "Docker", "image_name": "quay.io/biocontainers/samtools:1.19--h50ea8bc_1"},
+        {"image_type": "Conda", "image_name": "bioconda::samtools=1.19"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("cmdsaw.containers._SESSION.get", return_value=_fake_response(images=images)) as get:
+            first = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+            second = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+
+    assert get.call_count == 1
+    assert first == second
+    assert first["docker"] == "quay.io/biocontainers/samtools:1.19--h50ea8bc_1"
+    assert first["bioconda"] == "bioconda::samtools=1.19"
+    assert first["singularity"] is None
+
+
+def test_request_biocontainers_does_not_cache_errors():
+    """Test that failed lookups are retried on the next call."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("cmdsaw.containers._SESSION.get", return_value=_fake_response(status_code=404)) as get:
+            assert request_biocontainers("nosuchtool", "1.0", cache_dir=tmp)["error"] == 404
+            request_biocontainers("nosuchtool", "1.0", cache_dir=tmp)
+
+    assert get.call_count == 2
+
+
+def test_request_biocontainers_revalidates_expired_entries_with_etag():
+    """Test that an expired entry is revalidated and reused on 304 Not Modified."""
+    images = [{"image_type": "Docker", "image_name": "quay.io/biocontainers/samtools:1.19--h50ea8bc_1"}]
+    with tempfile.TemporaryDirectory() as tmp:
+        with patch("cmdsaw.containers._SESSION.get", return_value=_fake_response(images=images, etag='"abc"')):
+            first = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+        with patch("cmdsaw.containers._CACHE_TTL_SECONDS", 0), \
+             patch("cmdsaw.containers._SESSION.get", return_value=_fake_response(status_code=304)) as get:
+            second = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+    assert second == first
+
+
+def test_request_biocontainers_ignores_truncated_cache_entry():
+    """Test that a half-written cache entry is treated as a miss and replaced."""
+    from cmdsaw.containers import _cache_path
+    images = [{"image_type": "Docker", "image_name": "quay.io/biocontainers/samtools:1.19--h50ea8bc_1"}]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _cache_path("samtools", "1.19", tmp)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"etag": "\\"abc\\"", "result": {"dock')
+        with patch("cmdsaw.containers._CACHE_TTL_SECONDS", 0), \
+             patch("cmdsaw.containers._SESSION.get", return_value=_fake_response(images=images)) as get:
+            first = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+        # No ETag revalidation from the unreadable entry
+        assert get.call_args.kwargs["headers"] is None
+        with patch("cmdsaw.containers._SESSION.get") as get:
+            second = request_biocontainers("samtools", "1.19", cache_dir=tmp)
+
+    assert get.call_count == 0
+    assert first == second
+    assert first["docker"] == "quay.io/biocontainers/samtools:1.19--h50ea8bc_1"
+
+
 if __name__ == '__main__':
     test_container_info_schema()
     print("✓ test_container_info_schema passed")
@@ -124,4 +201,16 @@ if __name__ == '__main__':
     test_cmdsaw_result_with_container_info()
     print("✓ test_cmdsaw_result_with_container_info passed")
     
+    test_request_biocontainers_caches_successful_lookups()
+    print("✓ test_request_biocontainers_caches_successful_lookups passed")
+    
+    test_request_biocontainers_does_not_cache_errors()
+    print("✓ test_request_biocontainers_does_not_cache_errors passed")
+    
+    test_request_biocontainers_revalidates_expired_entries_with_etag()
+    print("✓ test_request_biocontainers_revalidates_expired_entries_with_etag passed")
+
+    test_request_biocontainers_ignores_truncated_cache_entry()
+    print("✓ test_request_biocontainers_ignores_truncated_cache_entry passed")
+    
     print("\nAll tests passed!")
@@ -0,0 +1,290 @@
+"""Test command tree discovery without invoking real commands or LLMs."""
+import re
+from unittest.mock import patch
+from pydantic import ValidationError
+from cmdsaw.discovery import build_tree
+from cmdsaw.parsing.llm_parser import _chunk_by_tokens, _structured_model, parse_command_help_batch
+from cmdsaw.parsing.schema import CommandDoc, CommandDocBatch
+
+TREE = {
+    "tool": ["view", "sort"],
+    "tool view": [],
+    "tool sort": ["fast"],
+    "tool sort fast": [],
+}
+
+
+def _patch_build_model(model):
+    """Patch the chat model factory, dropping structured runnables bound to earlier fakes."""
+    _structured_model.cache_clear()
+    return patch("cmdsaw.parsing.llm_parser._build_model", return_value=model)
+
+
+def _help(path):
+    return f"Usage: {path} [OPTIONS]\n\n  -v, --verbose  Increase verbosity\n"
+
+
+class _FakeStructured:
+    """Structured-output model stand-in that answers from TREE."""
+    def __init__(self, fail_paths=(), drop_paths=()):
+        self.fail_paths = set(fail_paths)
+        self.drop_paths = set(drop_paths)
+        self.schema = CommandDoc
+        self.calls = []
+        self.requests = 0
+
+    def _doc(self, messages):
+        self.requests += 1
+        docs = []
+        for path in re.findall(r"command_path: (.*)", messages[1]["content"]):
+            path = path.strip()
+            self.calls.append(path)
+            if path in self.fail_paths:
+                self.fail_paths.discard(path)
+                CommandDoc.model_validate({})
+            if path in self.drop_paths:
+                self.drop_paths.discard(path)
+                continue
+            docs.append(CommandDoc(name=path.split()[-1], path=path, help_text=f"help for {path}", subcommands=TREE.get(path, [])))
+        return CommandDocBatch(docs=docs) if self.schema is CommandDocBatch else docs[0]
+
+    def invoke(self, messages, *args, **kwargs):
+        return self._doc(messages)
+
+    def batch_as_completed(self, prompts, config=None, return_exceptions=False):
+        yield from enumerate(self.batch(prompts, config, return_exceptions))
+
+    def batch(self, prompts, config=None, return_exceptions=False):
+        out = []
+        for messages in prompts:
+            try:
+                out.append(self._doc(messages))
+            except ValidationError as e:
+                if not return_exceptions:
+                    raise
+                out.append(e)
+        return out
+
+
+class _FakeBound:
+    """Schema-bound view of a _FakeStructured, like a real structured runnable."""
+    def __init__(self, structured, schema):
+        self.structured = structured
+        self.schema = schema
+
+    def __getattr__(self, name):
+        self.structured.schema = self.schema
+        return getattr(self.structured, name)
+
+
+class _FakeModel:
+    def __init__(self, structured):
+        self.structured = structured
+
+    def with_structured_output(self, schema):
+        return _FakeBound(self.structured, schema)
+
+
+def _fake_help(path, *args, **kwargs):
+    return _help(" ".join(path)), 0
+
+
+async def _fake_help_async(path, *args, **kwargs):
+    return _fake_help(path)
+
+
+def _run_build_tree(structured, help_async=_fake_help_async, **kwargs):
+    with _patch_build_model(_FakeModel(structured)), \
+         patch("cmdsaw.discovery.which_or_raise", side_effect=lambda c: f"/bin/{c}"), \
+         patch("cmdsaw.discovery.try_help", side_effect=_fake_help), \
+         patch("cmdsaw.discovery.try_help_async", side_effect=help_async), \
+         patch("cmdsaw.discovery.try_version", return_value="1.0"), \
+         patch("cmdsaw.discovery.request_biocontainers", return_value={"error": 404, "message": "not found"}):
+        return build_tree(root_cmd="tool", model_name="m", use_cache=False, **kwargs)
+
+
+def test_build_tree_discovers_subcommands():
+    """Test that depth-1 subcommands are parsed and attached to the tool."""
+    structured = _FakeStructured()
+    result, all_docs = _run_build_tree(structured, concurrency=2)
+
+    assert [d.path for d in all_docs] == ["tool", "tool sort", "tool view"]
+    assert [c.path for c in result.tool.subcommands] == ["tool sort", "tool view"]
+    assert result.tool.version == "1.0"
+    assert result.diagnostics.visited_commands == 2
+    assert "tool sort fast" not in structured.calls
+
+
+def test_build_tree_follows_nested_subcommands():
+    """Test that depth-2 subcommands get the correct path and are not top-level children."""
+    structured = _FakeStructured()
+    captured = []
+
+    async def help_async(path, *args, **kwargs):
+        captured.append(" ".join(path))
+        return _fake_help(path)
+
+    result, all_docs = _run_build_tree(structured, help_async=help_async, max_depth=2)
+
+    assert [d.path for d in all_docs] == ["tool", "tool sort", "tool sort fast", "tool view"]
+    # Children's help is prefetched once as the parent parse lands, not captured again
+    assert sorted(captured) == ["/bin/tool sort", "/bin/tool sort fast", "/bin/tool view"]
+    assert [c.path for c in result.tool.subcommands] == ["tool sort", "tool view"]
+    assert result.diagnostics.visited_commands == 3
+
+
+def test_build_tree_visits_each_path_once():
+    """Test that a subcommand listed twice is only parsed once."""
+    structured = _FakeStructured()
+    with patch.dict(TREE, {"tool": ["view", "view"]}):
+        result, all_docs = _run_build_tree(structured)
+
+    assert [d.path for d in all_docs] == ["tool", "tool view"]
+    assert result.diagnostics.visited_commands == 1
+
+
+def test_build_tree_prefetches_help_during_review():
+    """Test that help captured while reviewing is reused and removed subcommands are dropped."""
+    structured = _FakeStructured()
+    captured = []
+
+    async def help_async(path, *args, **kwargs):
+        captured.append(" ".join(path))
+        return _fake_help(path)
+
+    answers = iter(["r", "2", "c"])
+    with patch("builtins.input", side_effect=lambda *a: next(answers)):
+        result, all_docs = _run_build_tree(structured, help_async=help_async, review_subcommands=True)
+
+    assert [d.path for d in all_docs] == ["tool", "tool view"]
+    assert sorted(captured) == ["/bin/tool sort", "/bin/tool view"]
+    assert structured.calls == ["tool", "tool view"]
+
+
+def test_parse_command_help_batch_uses_cache_and_preserves_order():
+    """Test that cache hits skip the LLM and results keep input order."""
+    structured = _FakeStructured()
+    stored = {}
+    cached_doc = CommandDoc(name="view", path="tool view", help_text="cached").model_dump()
+
+    def cache_get(path, version, model, help_text):
+        return cached_doc if path == "tool view" else None
+
+    def cache_set(path, version, model, help_text, data):
+        stored[path] = data
+
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(
+            model_name="m",
+            items=[("tool view", _help("tool view")), ("tool sort", _help("tool sort"))],
+            cache_getset=(cache_get, cache_set),
+        )
+
+    assert [d.path for d in docs] == ["tool view", "tool sort"]
+    assert docs[0].help_text == "cached"
+    assert structured.calls == ["tool sort"]
+    assert set(stored) == {"tool sort"}
+
+
+def test_parse_command_help_batch_retries_invalid_items():
+    """Test that items failing validation in the batch are retried individually."""
+    structured = _FakeStructured(fail_paths={"tool sort"})
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(model_name="m", items=[("tool sort", _help("tool sort"))])
+
+    assert docs[0].subcommands == ["fast"]
+    assert structured.calls == ["tool sort", "tool sort"]
+
+
+def test_parse_command_help_batch_groups_commands_per_request():
+    """Test that misses share multi-command requests and dropped items are retried."""
+    structured = _FakeStructured(drop_paths={"tool view"})
+    items = [(p, _help(p)) for p in ("tool view", "tool sort", "tool sort fast")]
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(model_name="m", items=items, batch_size=2)
+
+    assert [d.path for d in docs] == ["tool view", "tool sort", "tool sort fast"]
+    assert docs[1].subcommands == ["fast"]
+    # Two batched requests for three commands, plus one retry for the dropped item
+    assert structured.requests == 3
+    assert structured.calls == ["tool view", "tool sort", "tool sort fast", "tool view"]
+
+
+def test_parse_command_help_batch_dedupes_identical_help():
+    """Test that commands printing identical help text are parsed only once."""
+    structured = _FakeStructured()
+    items = [("tool view", _help("tool")), ("tool sort", _help("tool").replace("  ", "    "))]
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(model_name="m", items=items)
+
+    assert structured.calls == ["tool view"]
+    assert [(d.name, d.path) for d in docs] == [("view", "tool view"), ("sort", "tool sort")]
+    # The copy keeps its own help text and shares no lists with the original
+    assert docs[1].help_text == items[1][1]
+    assert docs[1].options == docs[0].options and docs[1].options is not docs[0].options
+
+
+def test_parse_command_help_batch_skips_llm_for_short_help():
+    """Test that empty or near-empty help text never reaches the LLM."""
+    structured = _FakeStructured()
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(model_name="m", items=[("tool view", "  \n"), ("tool sort", "usage: sort")])
+
+    assert structured.calls == []
+    assert [(d.name, d.path, d.options) for d in docs] == [("view", "tool view", []), ("sort", "tool sort", [])]
+
+
+def test_parse_command_help_batch_template_parse_skips_llm():
+    """Test that click generated help is parsed without the LLM when enabled."""
+    structured = _FakeStructured()
+    click_help = "Usage: tool view [OPTIONS] INPUT\n\nOptions:\n  --help  Show this message and exit.\n"
+    items = [("tool view", click_help), ("tool sort", _help("tool sort"))]
+    with _patch_build_model(_FakeModel(structured)):
+        docs = parse_command_help_batch(model_name="m", items=items, template_parse=True)
+
+    assert structured.calls == ["tool sort"]
+    assert [p.name for p in docs[0].positionals] == ["input"]
+
+
+def test_chunk_by_tokens_respects_count_and_budget():
+    """Test that chunks close on item count or token budget, and oversized items stand alone."""
+    assert _chunk_by_tokens([0, 1, 2], [10, 10, 10], 2, 100) == [[0, 1], [2]]
+    assert _chunk_by_tokens([0, 1, 2, 3], [40, 40, 40, 500], 8, 100) == [[0, 1], [2], [3]]
+    assert _chunk_by_tokens([], [], 8, 100) == []
+
+
+if __name__ == '__main__':
+    test_build_tree_discovers_subcommands()
+    print("✓ test_build_tree_discovers_subcommands passed")
+
+    test_build_tree_follows_nested_subcommands()
+    print("✓ test_build_tree_follows_nested_subcommands passed")
+
+    test_build_tree_visits_each_path_once()
+    print("✓ test_build_tree_visits_each_path_once passed")
+
+    test_build_tree_prefetches_help_during_review()
+    print("✓ test_build_tree_prefetches_help_during_review passed")
+
+    test_parse_command_help_batch_uses_cache_and_preserves_order()
+    print("✓ test_parse_command_help_batch_uses_cache_and_preserves_order passed")
+
+    test_parse_command_help_batch_retries_invalid_items()
+    print("✓ test_parse_command_help_batch_retries_invalid_items passed")
+
+    test_parse_command_help_batch_groups_commands_per_request()
+    print("✓ test_parse_command_help_batch_groups_commands_per_request passed")
+
+    test_parse_command_help_batch_dedupes_identical_help()
+    print("✓ test_parse_command_help_batch_dedupes_identical_help passed")
+
+    test_parse_command_help_batch_skips_llm_for_short_help()
+    print("✓ test_parse_command_help_batch_skips_llm_for_short_help passed")
+
+    test_parse_command_help_batch_template_parse_skips_llm()
+    print("✓ test_parse_command_help_batch_template_parse_skips_llm passed")
+
+    test_chunk_by_tokens_respects_count_and_budget()
+    print("✓ test_chunk_by_tokens_respects_count_and_budget passed")
+
+    print("\nAll tests passed!")
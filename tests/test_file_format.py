@@ -1,6 +1,10 @@
 """Test file_format field for tracking file formats and EDAM ontology."""
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 from cmdsaw.parsing.schema import CommandDoc, ToolDoc, OptionDoc, PositionalDoc, FileFormat
-from cmdsaw.parsing.edam_mappings import get_edam_format, get_edam_uri
+from cmdsaw.parsing import edam_mappings
+from cmdsaw.parsing.edam_mappings import _EDAM_TSV_PATHS, _load_edam, _load_edam_cached, get_edam_format, get_edam_uri
 
 
 def test_file_format_class():
@@ -148,6 +152,38 @@ def test_edam_mappings():
     assert uri == "http://edamontology.org/format_1929"
 
 
+def test_edam_mappings_load_once_on_first_lookup():
+    """Test that EDAM.tsv is parsed lazily and only once."""
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("cmdsaw.parsing.edam_mappings._EDAM_CACHE_PATH", Path(tmp) / "edam.json"):
+        _load_edam.cache_clear()
+        get_edam_format.cache_clear()
+        get_edam_format(".bam")
+        get_edam_format(".vcf")
+        assert _load_edam.cache_info().misses == 1
+
+
+def test_edam_mappings_are_read_only():
+    """Test that the shared extension map cannot be mutated by callers."""
+    try:
+        edam_mappings.EXTENSION_TO_EDAM[".bam"] = ("format_0000", "Not BAM")
+        assert False, "EXTENSION_TO_EDAM should be read-only"
+    except TypeError:
+        pass
+    assert get_edam_format(".BAM") == get_edam_format("bam") == ("format_2572", "BAM")
+
+
+def test_edam_parse_is_cached_on_disk():
+    """Test that a second load reuses the cached map without reparsing EDAM.tsv."""
+    tsv = next(p for p in _EDAM_TSV_PATHS if p.exists())
+    with tempfile.TemporaryDirectory() as tmp, \
+         patch("cmdsaw.parsing.edam_mappings._EDAM_CACHE_PATH", Path(tmp) / "edam.json"):
+        parsed = _load_edam_cached(tsv)
+        with patch("cmdsaw.parsing.edam_mappings._parse_edam_tsv", side_effect=AssertionError("reparsed")):
+            assert _load_edam_cached(tsv) == parsed
+    assert parsed[".bam"] == ("format_2572", "BAM")
+
+
 if __name__ == '__main__':
     test_file_format_class()
     print("✓ test_file_format_class passed")
@@ -167,4 +203,13 @@ if __name__ == '__main__':
     test_edam_mappings()
     print("✓ test_edam_mappings passed")
     
+    test_edam_mappings_load_once_on_first_lookup()
+    print("✓ test_edam_mappings_load_once_on_first_lookup passed")
+    
+    test_edam_mappings_are_read_only()
+    print("✓ test_edam_mappings_are_read_only passed")
+    
+    test_edam_parse_is_cached_on_disk()
+    print("✓ test_edam_parse_is_cached_on_disk passed")
+    
     print("\nAll file_format tests passed!")
@@ -3,8 +3,12 @@ Tests for JSON review functionality.
 """
 from __future__ import annotations
 import json
-from cmdsaw.parsing.schema import CmdSawResult, ToolDoc, CommandDoc, ParseDiagnostics, OptionDoc, PositionalDoc
-from cmdsaw.json_review import display_json_summary, llm_double_check, llm_fix_issues
+import os
+import re
+from cmdsaw.parsing.schema import CmdSawPatch, CmdSawPatchSet, CmdSawResult, ToolDoc, CommandDoc, CommandDocBatch, ParseDiagnostics, OptionDoc, PositionalDoc
+from cmdsaw.parsing.cache import ParseCache, normalize_help_text
+from cmdsaw.json_review import _apply_patches, _extract_salient_sections, _iter_json_view, display_json_summary, llm_double_check, llm_fix_issues
+from cmdsaw.parsing.llm_parser import _structured_model
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 import pytest
@@ -195,5 +199,250 @@ def test_llm_fix_issues_invalid_provider():
         llm_fix_issues(result, "test-model", "invalid-provider", 0.0, None, [], "Fix something")
 
 
+def test_iter_json_view_yields_full_document():
+    """Test that the paged JSON view contains the whole serialized result."""
+    tool = ToolDoc(command="test-tool", help_text="Test tool help text", invocation=["test-tool"], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+
+    lines = list(_iter_json_view(result))
+
+    assert lines[1] == "FULL JSON OUTPUT\n"
+    body = "".join(lines[3:-1])
+    assert CmdSawResult.model_validate(json.loads(body)) == result
+
+
+def test_structured_model_is_reused():
+    """Test that review rounds with the same settings bind each schema only once."""
+    fake_model = MagicMock()
+    _structured_model.cache_clear()
+    with patch("cmdsaw.parsing.llm_parser._build_model", return_value=fake_model):
+        first = _structured_model("test-model", "ollama", 0.0, None, CmdSawResult)
+        second = _structured_model("test-model", "ollama", 0.0, None, CmdSawResult)
+        _structured_model("test-model", "ollama", 0.0, None, CmdSawPatchSet)
+    _structured_model.cache_clear()
+
+    assert first is second
+    assert [c.args for c in fake_model.with_structured_output.call_args_list] == [(CmdSawResult,), (CmdSawPatchSet,)]
+
+
+def _structured_by_schema(**models):
+    """Patch json_review's structured model lookup to return a mock per schema name."""
+    return patch("cmdsaw.json_review._structured_model", side_effect=lambda *args: models[args[-1].__name__])
+
+
+def test_llm_double_check_verifies_node_chunks_and_merges_by_path():
+    """Test that each chunk sees only its own nodes and verified nodes merge back by path."""
+    subs = [CommandDoc(name=f"sub{i}", path=f"test-tool sub{i}", help_text=f"sub{i} help", options=[OptionDoc(long="--orig")]) for i in range(6)]
+    tool = ToolDoc(command="test-tool", help_text="root help", invocation=["test-tool"], subcommands=subs, captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+    prompts = []
+
+    async def ainvoke(messages):
+        prompt = messages[1]["content"]
+        prompts.append(prompt)
+        paths = re.findall(r"^Command: (.+)$", prompt, re.M)
+        # The model drops sub5 from its answer; it must survive unchanged
+        return CommandDocBatch(docs=[
+            CommandDoc(name="x", path=path, help_text="", options=[OptionDoc(long="--verified")])
+            for path in paths if path != "test-tool sub5"
+        ])
+
+    structured = MagicMock()
+    structured.ainvoke = ainvoke
+    with _structured_by_schema(CommandDocBatch=structured):
+        verified = llm_double_check(result, "test-model", "ollama", 0.0, None, [])
+
+    assert len(prompts) == 2
+    assert "Command: test-tool sub5\n" in prompts[1]
+    assert '"path": "test-tool sub0"' not in prompts[1]
+    assert "sub0 help" not in prompts[1]
+    assert [o.long for o in verified.tool.options] == ["--verified"]
+    assert [sub.path for sub in verified.tool.subcommands] == [sub.path for sub in subs]
+    assert all(sub.options[0].long == "--verified" for sub in verified.tool.subcommands[:5])
+    assert verified.tool.subcommands[5] == subs[5]
+    assert [sub.name for sub in verified.tool.subcommands] == [sub.name for sub in subs]
+    assert verified.tool.subcommands[0].help_text == "sub0 help"
+
+
+def test_llm_double_check_keeps_nodes_of_failed_chunks():
+    """Test that a failing chunk leaves its nodes as they were while other chunks still merge."""
+    subs = [CommandDoc(name=f"sub{i}", path=f"test-tool sub{i}", help_text=f"sub{i} help") for i in range(6)]
+    tool = ToolDoc(command="test-tool", help_text="root help", invocation=["test-tool"], subcommands=subs, captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+
+    async def ainvoke(messages):
+        if "Command: test-tool sub5\n" in messages[1]["content"]:
+            raise RuntimeError("model unavailable")
+        return CommandDocBatch(docs=[CommandDoc(name="sub0", path="test-tool sub0", help_text="", options=[OptionDoc(long="--added")])])
+
+    structured = MagicMock()
+    structured.ainvoke = ainvoke
+    with _structured_by_schema(CommandDocBatch=structured):
+        verified = llm_double_check(result, "test-model", "ollama", 0.0, None, [])
+
+    assert verified.tool.subcommands[0].options[0].long == "--added"
+    assert verified.tool.subcommands[1:] == subs[1:]
+
+
+def test_llm_fix_issues_streams_partial_results(capsys):
+    """Test that llm_fix_issues reports streamed progress and validates the final chunk."""
+    tool = ToolDoc(command="test-tool", help_text="Test tool help text", invocation=["test-tool"], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+    final = result.model_dump(mode="json")
+    final["tool"]["options"] = [{"long": "--fixed"}]
+    structured = MagicMock()
+    structured.stream.return_value = iter([{"tool": {"options": []}}, final])
+
+    patcher = MagicMock()
+    patcher.invoke.return_value = CmdSawPatchSet()
+    with _structured_by_schema(CmdSawResult=structured, CmdSawPatchSet=patcher):
+        corrected = llm_fix_issues(result, "test-model", "ollama", 0.0, None, [], "Add --fixed")
+
+    assert corrected.tool.options[0].long == "--fixed"
+    assert "1 options so far" in capsys.readouterr().out
+
+
+def test_llm_fix_issues_applies_targeted_patches():
+    """Test that patch responses are applied locally without regenerating the whole result."""
+    tool = ToolDoc(command="test-tool", help_text="Test tool help text", invocation=["test-tool"], options=[OptionDoc(long="--in", description="old")], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+    patcher = MagicMock()
+    patcher.invoke.return_value = CmdSawPatchSet(patches=[CmdSawPatch(path="tool.options[0].description", new_value="Input file")])
+    structured = MagicMock()
+
+    with _structured_by_schema(CmdSawResult=structured, CmdSawPatchSet=patcher):
+        corrected = llm_fix_issues(result, "test-model", "ollama", 0.0, None, [], "Describe --in")
+
+    assert corrected.tool.options[0].description == "Input file"
+    assert result.tool.options[0].description == "old"
+    structured.stream.assert_not_called()
+
+
+def test_apply_patches_appends_and_rejects_unknown_fields():
+    """Test that list-length indices append and unknown fields raise."""
+    tool = ToolDoc(command="test-tool", help_text="Test tool help text", invocation=["test-tool"], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+
+    patched = _apply_patches(result, [CmdSawPatch(path="tool.options[0]", new_value={"long": "--new"})])
+    assert patched.tool.options[0].long == "--new"
+
+    with pytest.raises(KeyError):
+        _apply_patches(result, [CmdSawPatch(path="tool.nonexistent", new_value=1)])
+
+
+def test_double_check_prompt_ignores_whitespace_differences():
+    """Test that help texts differing only in spacing produce the same double-check prompt."""
+    tool = ToolDoc(command="test-tool", help_text="Usage: test-tool [OPTIONS]\n  --flag    Enable it\n", invocation=["test-tool"], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+    prompts = []
+
+    async def ainvoke(messages):
+        prompts.append(messages[1]["content"])
+        return CommandDocBatch()
+
+    structured = MagicMock()
+    structured.ainvoke = ainvoke
+    with _structured_by_schema(CommandDocBatch=structured):
+        llm_double_check(result, "test-model", "ollama", 0.0, None, [])
+        wide = result.model_copy(update={"tool": tool.model_copy(update={"help_text": "Usage: test-tool [OPTIONS]  \n  --flag\t\t\tEnable it\n\n\n"})})
+        llm_double_check(wide, "test-model", "ollama", 0.0, None, [])
+
+    assert prompts[0].split("Current parsed JSON")[0] == prompts[1].split("Current parsed JSON")[0]
+
+
+def test_extract_salient_sections_drops_banners_and_prose():
+    """Test that only usage and option/argument/command sections are kept."""
+    help_text = """Program: tool (Tools for alignments)
+Version: 1.2.3
+
+usage: tool [-h] [-o OUT] input
+
+Does many things with many files, explained at great length.
+
+positional arguments:
+  input       Input file
+
+options:
+  -h, --help  show this help message and exit
+  -o OUT      Output file
+
+See https://example.org for the manual."""
+
+    salient = _extract_salient_sections(help_text)
+
+    assert salient.startswith("usage: tool")
+    assert "positional arguments:\n  input" in salient
+    assert "-o OUT      Output file" in salient
+    assert "Version" not in salient and "great length" not in salient and "manual" not in salient
+    assert _extract_salient_sections("just some prose") == "just some prose"
+
+
+def test_extract_salient_sections_keeps_gnu_option_list():
+    """Test that real GNU --help output, whose options have no heading, is kept whole."""
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "ls_help.txt"), encoding="utf-8") as f:
+        help_text = normalize_help_text(f.read())
+
+    salient = _extract_salient_sections(help_text)
+
+    assert salient == help_text
+    for flag in ("--almost-all", "--block-size=SIZE", "--group-directories-first", "-1"):
+        assert flag in salient
+
+
+def test_extract_salient_sections_recognizes_flag_and_parenthesized_headings():
+    """Test that cobra-style Flags: and bowtie2-style Options (...): sections are kept."""
+    cobra = """kubectl controls the Kubernetes cluster manager.
+
+Usage:
+  kubectl get [flags]
+
+Flags:
+  -A, --all-namespaces         If present, list across all namespaces
+  -o, --output string          Output format
+  -w, --watch                  After listing, watch for changes
+
+Global Flags:
+      --kubeconfig string      Path to the kubeconfig file"""
+    bowtie = """Bowtie 2 version 2.5.1 by Ben Langmead
+
+Usage:
+  bowtie2 [options]* -x <bt2-idx> {-1 <m1> -2 <m2> | -U <r>} [-S <sam>]
+
+Options (defaults in parentheses):
+ Input:
+  -q                 query input files are FASTQ .fq/.fastq (default)
+  --qseq             query input files are in Illumina's QSEQ format
+  -p/--threads <int> number of alignment threads to launch (1)"""
+
+    salient = _extract_salient_sections(cobra)
+    assert "--all-namespaces" in salient and "--kubeconfig" in salient
+    assert "controls the Kubernetes" not in salient
+    salient = _extract_salient_sections(bowtie)
+    assert "--qseq" in salient and "--threads" in salient
+    assert "Ben Langmead" not in salient
+
+
+def test_llm_double_check_skips_previously_confirmed_result(tmp_path):
+    """Test that an unchanged double-check is remembered and skipped on the next run."""
+    tool = ToolDoc(command="test-tool", help_text="usage: test-tool [-v]", invocation=["test-tool"], captured_at="2025-01-01T00:00:00Z")
+    result = CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+    calls = []
+
+    async def ainvoke(messages):
+        calls.append(messages)
+        return CommandDocBatch()
+
+    structured = MagicMock()
+    structured.ainvoke = ainvoke
+    cache = ParseCache(str(tmp_path))
+    with _structured_by_schema(CommandDocBatch=structured):
+        llm_double_check(result, "test-model", "ollama", 0.0, None, [], cache=cache)
+        rerun = result.model_copy(update={"tool": tool.model_copy(update={"captured_at": "2025-02-02T00:00:00Z"})})
+        assert llm_double_check(rerun, "test-model", "ollama", 0.0, None, [], cache=cache) is rerun
+        llm_double_check(rerun, "other-model", "ollama", 0.0, None, [], cache=cache)
+
+    assert len(calls) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,10 +1,21 @@
 """Test provider support and model configuration."""
+import json
 import pytest
-from cmdsaw.parsing.llm_parser import _build_model
+from unittest.mock import patch, MagicMock
+from cmdsaw.constants import DEFAULT_KEEP_ALIVE, DEFAULT_NUM_CTX
+from cmdsaw.parsing.llm_parser import _build_model, _structured_model, parse_command_help, parse_command_help_batch
+from cmdsaw.parsing.prompts import FEWSHOT, FEWSHOT_BLOB, SYSTEM_PROMPT
+from cmdsaw.parsing.schema import CommandDoc
 from langchain_ollama import ChatOllama
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 
+def _patch_build_model(model):
+    """Patch the chat model factory, dropping structured runnables bound to earlier fakes."""
+    _structured_model.cache_clear()
+    return patch("cmdsaw.parsing.llm_parser._build_model", return_value=model)
+
+
 def test_build_ollama_model():
     """Test that Ollama model is built correctly."""
     model = _build_model("gemma3:12b", provider="ollama", temperature=0.5)
@@ -67,6 +78,159 @@ def test_google_model_with_zero_temperature():
     assert model.temperature == 0.0
 
 
+def test_ollama_model_is_kept_alive():
+    """Test that Ollama models stay loaded so the prompt prefix KV cache is reused."""
+    model = _build_model("gemma3:12b", provider="ollama", temperature=0.0)
+
+    assert model.keep_alive == DEFAULT_KEEP_ALIVE
+    assert model.num_ctx == DEFAULT_NUM_CTX
+
+
+def test_build_model_reuses_client():
+    """Test that repeated builds with the same settings share one model and HTTP client."""
+    assert _build_model("gemma3:12b", "ollama", 0.0) is _build_model("gemma3:12b", "ollama", 0.0)
+    assert _build_model("gemma3:12b", "ollama", 0.0) is not _build_model("gemma3:12b", "ollama", 0.5)
+
+
+def test_parse_prompts_share_static_system_prefix():
+    """Test that every parse sends a byte-identical system message."""
+    structured = MagicMock()
+    structured.invoke.side_effect = lambda msgs: CommandDoc(name="x", path="x", help_text="")
+    fake_model = MagicMock()
+    fake_model.with_structured_output.return_value = structured
+
+    with _patch_build_model(fake_model):
+        parse_command_help(model_name="m", command_path="samtools view", help_text="Usage: samtools view")
+        parse_command_help(model_name="m", command_path="samtools sort", help_text="Usage: samtools sort")
+
+    first, second = [call.args[0] for call in structured.invoke.call_args_list]
+    assert first[0]["content"].startswith(SYSTEM_PROMPT)
+    assert first[0]["content"] == second[0]["content"]
+    assert "samtools view" not in first[0]["content"]
+    assert "samtools view" in first[1]["content"]
+
+    structured.batch_as_completed.side_effect = lambda prompts, **kwargs: iter([(0, ValueError("stop"))])
+    with _patch_build_model(fake_model), pytest.raises(ValueError):
+        parse_command_help_batch(model_name="m", items=[("samtools view", "Usage: samtools view [options] <in.bam>"), ("samtools sort", "Usage: samtools sort [options] <in.bam>")])
+    batched = structured.batch_as_completed.call_args.args[0][0]
+    assert batched[0]["content"].startswith(first[0]["content"])
+
+
+
+def test_fewshot_examples_are_serialized_as_json():
+    """Test that few-shot examples reach the prompt as valid JSON, not Python reprs."""
+    examples = [block.split("\n", 1)[0] for block in FEWSHOT_BLOB.split("### Example JSON:\n")[1:]]
+    assert [json.loads(e) for e in examples] == [ex["json"] for ex in FEWSHOT]
+
+
+def test_fewshot_json_matches_without_orjson():
+    """Test that the stdlib fallback produces the same compact few-shot JSON as orjson."""
+    from cmdsaw.parsing import prompts
+    encoded = [prompts._compact_json(ex["json"]) for ex in FEWSHOT]
+    with patch.object(prompts, "orjson", None):
+        assert [prompts._compact_json(ex["json"]) for ex in FEWSHOT] == encoded
+
+
+def test_estimate_resources_reuses_structured_output_binding():
+    """Test that estimating several commands binds the ResourceEstimate schema only once."""
+    from cmdsaw.parsing.resource_estimator import ResourceEstimate, estimate_resources
+    fake_model = MagicMock()
+    fake_model.with_structured_output.return_value.invoke.return_value = ResourceEstimate(cpu=2, mem_gb=4.0)
+
+    with _patch_build_model(fake_model):
+        for path in ("samtools view", "samtools sort"):
+            assert estimate_resources(CommandDoc(name=path.split()[-1], path=path, help_text=""), model_name="est").cpu == 2
+    fake_model.with_structured_output.assert_called_once_with(ResourceEstimate)
+
+
+def test_estimate_resources_reuses_estimate_for_same_help():
+    """Test that subcommands with identical (whitespace-normalized) help text share one estimate."""
+    from cmdsaw.parsing.resource_estimator import ResourceEstimate, estimate_resources
+    fake_model = MagicMock()
+    invoke = fake_model.with_structured_output.return_value.invoke
+    invoke.return_value = ResourceEstimate(cpu=4, mem_gb=8.0)
+    help_text = "Usage: tool sort [options]\n  -@ INT   threads"
+
+    with _patch_build_model(fake_model):
+        first = estimate_resources(CommandDoc(name="sort", path="tool sort", help_text=help_text), model_name="est-memo")
+        second = estimate_resources(CommandDoc(name="srt", path="tool srt", help_text=help_text.replace("   ", "\t")), model_name="est-memo")
+        other = estimate_resources(CommandDoc(name="view", path="tool view", help_text="Usage: tool view"), model_name="est-memo")
+    assert (first.cpu, second.cpu, other.cpu) == (4, 4, 4)
+    assert invoke.call_count == 2
+
+
+def test_estimate_resources_batch_packs_commands_into_one_request():
+    """Test that batched estimates share one request, dedupe identical help and fall back per command."""
+    from cmdsaw.parsing.resource_estimator import CommandEstimate, ResourceEstimate, ResourceEstimateBatch, estimate_resources_batch
+    fake_model = MagicMock()
+    structured = fake_model.with_structured_output.return_value
+    structured.batch_as_completed.side_effect = lambda prompts, **kwargs: iter([
+        (0, ResourceEstimateBatch(estimates=[CommandEstimate(path="tool sort", cpu=8, mem_gb=16.0)])),
+    ])
+    structured.invoke.return_value = ResourceEstimate(cpu=1, mem_gb=1.0)
+    docs = [
+        CommandDoc(name="sort", path="tool sort", help_text="Usage: tool sort -@ INT"),
+        CommandDoc(name="view", path="tool view", help_text="Usage: tool view"),
+        CommandDoc(name="srt", path="tool srt", help_text="Usage: tool sort -@ INT"),
+    ]
+
+    with _patch_build_model(fake_model):
+        estimates = estimate_resources_batch(docs, model_name="est-batch")
+    assert [e.cpu for e in estimates] == [8, 1, 8]
+    prompts = structured.batch_as_completed.call_args.args[0]
+    assert len(prompts) == 1
+    assert prompts[0][1]["content"].count("---\ncommand_path:") == 2
+    # Only "tool view" was missing from the batched response
+    assert structured.invoke.call_count == 1
+
+
+def test_estimate_resources_trims_long_help():
+    """Test that only the head and tail of long help text reach the estimator prompt."""
+    from cmdsaw.parsing.resource_estimator import ResourceEstimate, estimate_resources
+    fake_model = MagicMock()
+    invoke = fake_model.with_structured_output.return_value.invoke
+    invoke.return_value = ResourceEstimate(cpu=1, mem_gb=1.0)
+    help_text = "Usage: tool big\n" + "".join(f"  --opt{i} INT   option {i}\n" for i in range(500)) + "Examples: tool big -t 4"
+
+    with _patch_build_model(fake_model):
+        estimate_resources(CommandDoc(name="big", path="tool big", help_text=help_text), model_name="est-trim")
+    user = invoke.call_args.args[0][1]["content"]
+    assert "Usage: tool big" in user and user.rstrip().endswith("Examples: tool big -t 4")
+    assert "...[truncated " in user
+    assert len(user) < 2200
+
+
+def test_parse_reuses_structured_output_binding():
+    """Test that parsing several commands binds the CommandDoc schema only once per model."""
+    fake_model = MagicMock()
+    fake_model.with_structured_output.return_value.invoke.side_effect = lambda msgs: CommandDoc(name="x", path="x", help_text="")
+
+    with _patch_build_model(fake_model):
+        parse_command_help(model_name="bind-once", command_path="samtools view", help_text="Usage: samtools view")
+        parse_command_help(model_name="bind-once", command_path="samtools sort", help_text="Usage: samtools sort")
+
+    fake_model.with_structured_output.assert_called_once_with(CommandDoc)
+
+
+def test_retry_reminder_is_not_accumulated():
+    """Test that each retry sends the original prompt plus a single reminder."""
+    sent = []
+
+    def invoke(msgs):
+        sent.append(msgs[1]["content"])
+        if len(sent) < 3:
+            CommandDoc.model_validate({})
+        return CommandDoc(name="x", path="x", help_text="")
+
+    fake_model = MagicMock()
+    fake_model.with_structured_output.return_value.invoke.side_effect = invoke
+    with _patch_build_model(fake_model):
+        parse_command_help(model_name="retry-once", command_path="samtools view", help_text="Usage: samtools view")
+
+    assert sent[1] == sent[2]
+    assert sent[2].count("Reminder:") == 1
+    assert sent[2].startswith(sent[0])
+
 if __name__ == '__main__':
     test_build_ollama_model()
     print("✓ test_build_ollama_model passed")
@@ -86,4 +250,32 @@ if __name__ == '__main__':
     test_google_model_with_zero_temperature()
     print("✓ test_google_model_with_zero_temperature passed")
     
+    test_ollama_model_is_kept_alive()
+    print("✓ test_ollama_model_is_kept_alive passed")
+    
+    test_build_model_reuses_client()
+    print("✓ test_build_model_reuses_client passed")
+
+    test_parse_prompts_share_static_system_prefix()
+    print("✓ test_parse_prompts_share_static_system_prefix passed")
+
+    test_fewshot_examples_are_serialized_as_json()
+    print("✓ test_fewshot_examples_are_serialized_as_json passed")
+    test_fewshot_json_matches_without_orjson()
+    print("✓ test_fewshot_json_matches_without_orjson passed")
+
+    test_estimate_resources_reuses_structured_output_binding()
+    print("✓ test_estimate_resources_reuses_structured_output_binding passed")
+    test_estimate_resources_reuses_estimate_for_same_help()
+    print("✓ test_estimate_resources_reuses_estimate_for_same_help passed")
+    test_estimate_resources_batch_packs_commands_into_one_request()
+    print("✓ test_estimate_resources_batch_packs_commands_into_one_request passed")
+    test_estimate_resources_trims_long_help()
+    print("✓ test_estimate_resources_trims_long_help passed")
+    test_parse_reuses_structured_output_binding()
+    print("✓ test_parse_reuses_structured_output_binding passed")
+
+    test_retry_reminder_is_not_accumulated()
+    print("✓ test_retry_reminder_is_not_accumulated passed")
+    
     print("\nAll tests passed!")
@@ -0,0 +1,132 @@
+"""Test help/version capture helpers."""
+import asyncio
+import subprocess
+import sys
+import time
+import pytest
+from datetime import datetime, timezone
+from cmdsaw.runner import now_iso, try_help, try_version
+from cmdsaw.utils import run_capture, run_capture_async
+
+# Fake tool: "--slow" answers after a delay, "help" answers at once, anything else prints nothing
+_FAKE_TOOL = "import sys, time; f = sys.argv[1]; time.sleep(0.5 if f == '--slow' else 0); print({'--slow': 'slow usage', 'help': 'usage: tool'}.get(f, ''), end='')"
+
+
+def test_run_capture_async_matches_sync():
+    """Test that async capture returns the same output as the sync helper."""
+    cmd = [sys.executable, "-c", "import sys; print('\\x1b[1mUsage:\\x1b[0m tool'); sys.exit(2)"]
+    assert asyncio.run(run_capture_async(cmd, timeout=10)) == run_capture(cmd, timeout=10)
+    assert run_capture(cmd, timeout=10) == ("Usage: tool", 2)
+
+
+def test_run_capture_async_falls_back_to_stderr():
+    """Test that stderr is used when stdout is empty."""
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('usage: tool [-h]\\n')"]
+    out, code = asyncio.run(run_capture_async(cmd, timeout=10))
+    assert out == "usage: tool [-h]"
+    assert code == 0
+
+
+def test_run_capture_async_timeout():
+    """Test that a hung command raises TimeoutExpired like the sync helper."""
+    cmd = [sys.executable, "-c", "import time; time.sleep(5)"]
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run_capture_async(cmd, timeout=0.2))
+
+
+def test_run_capture_async_stops_idle_help():
+    """Test that a command printing help and then waiting is stopped once idle."""
+    cmd = [sys.executable, "-c", "import time; print('Usage: tool [options]', flush=True); time.sleep(30)"]
+    start = time.monotonic()
+    out, _ = asyncio.run(run_capture_async(cmd, timeout=10, idle_timeout=0.3))
+    assert out == "Usage: tool [options]"
+    assert time.monotonic() - start < 5
+
+
+def test_run_capture_async_idle_keeps_slow_output():
+    """Test that short pauses in help output do not truncate it, and non-help output still times out."""
+    cmd = [sys.executable, "-c", "import time; print('Usage: tool', flush=True); time.sleep(0.1); print('  -x  flag')"]
+    assert asyncio.run(run_capture_async(cmd, timeout=10, idle_timeout=0.5))[0] == "Usage: tool\n  -x  flag"
+    cmd = [sys.executable, "-c", "import time; print('working', flush=True); time.sleep(5)"]
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(run_capture_async(cmd, timeout=0.5, idle_timeout=0.1))
+
+
+def test_try_help_stops_at_first_answer(tmp_path):
+    """Test that later help and version flags are never run once an earlier flag answered."""
+    log = tmp_path / "calls.txt"
+    tool = f"import sys; open({str(log)!r}, 'a').write(sys.argv[1] + '\\n'); print('usage: tool' if sys.argv[1] in ('--help', '--version') else '', end='')"
+    out, _ = try_help([sys.executable, "-c", tool], ["--help", "-h"], timeout=10, env=None, cwd=None)
+    assert out == "usage: tool"
+    assert log.read_text().split() == ["--help"]
+
+    log.unlink()
+    try_version([sys.executable, "-c", tool.replace("usage: tool", "tool 1.2.3")], timeout=10, env=None, cwd=None)
+    assert log.read_text().split() == ["--version"]
+
+
+def test_capture_does_not_wait_on_stdin():
+    """Test that a tool reading stdin instead of printing help sees EOF rather than hanging."""
+    cmd = [sys.executable, "-c", "import sys; print('read', len(sys.stdin.read()))"]
+    assert asyncio.run(run_capture_async(cmd, timeout=5)) == ("read 0", 0)
+    assert run_capture(cmd, timeout=5) == ("read 0", 0)
+
+
+def test_try_help_prefers_earlier_flag():
+    """Test that an earlier flag's output wins even if a later flag would answer faster."""
+    out, _ = try_help([sys.executable, "-c", _FAKE_TOOL], ["--slow", "help"], timeout=10, env=None, cwd=None)
+    assert out == "slow usage"
+    out, _ = try_help([sys.executable, "-c", _FAKE_TOOL], ["--none", "help", "--slow"], timeout=10, env=None, cwd=None)
+    assert out == "usage: tool"
+
+
+def test_try_version_scans_past_banner_line():
+    """Test that a version printed after a banner line is still found."""
+    tool = "import sys; print('MyTool - fast things\\nVersion: 2.4.1' if sys.argv[1] == '--version' else '')"
+    assert try_version([sys.executable, "-c", tool], timeout=10, env=None, cwd=None) == "2.4.1"
+    assert try_version([sys.executable, "-c", "print('no version here')"], timeout=10, env=None, cwd=None) is None
+
+
+def test_now_iso_format():
+    """Test that now_iso returns a second-resolution UTC timestamp with a Z suffix."""
+    before = datetime.now(timezone.utc).replace(microsecond=0)
+    stamp = now_iso()
+    after = datetime.now(timezone.utc).replace(microsecond=0)
+    assert len(stamp) == 20 and stamp.endswith("Z")
+    assert before <= datetime.fromisoformat(stamp[:-1]).replace(tzinfo=timezone.utc) <= after
+
+
+if __name__ == '__main__':
+    test_run_capture_async_matches_sync()
+    print("✓ test_run_capture_async_matches_sync passed")
+
+    test_run_capture_async_falls_back_to_stderr()
+    print("✓ test_run_capture_async_falls_back_to_stderr passed")
+
+    test_run_capture_async_timeout()
+    print("✓ test_run_capture_async_timeout passed")
+
+    test_run_capture_async_stops_idle_help()
+    print("✓ test_run_capture_async_stops_idle_help passed")
+
+    test_run_capture_async_idle_keeps_slow_output()
+    print("✓ test_run_capture_async_idle_keeps_slow_output passed")
+
+    import pathlib, tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_try_help_stops_at_first_answer(pathlib.Path(tmp))
+    print("✓ test_try_help_stops_at_first_answer passed")
+
+    test_capture_does_not_wait_on_stdin()
+    print("✓ test_capture_does_not_wait_on_stdin passed")
+
+    test_try_help_prefers_earlier_flag()
+    print("✓ test_try_help_prefers_earlier_flag passed")
+
+    test_try_version_scans_past_banner_line()
+    print("✓ test_try_version_scans_past_banner_line passed")
+
+    test_now_iso_format()
+    print("✓ test_now_iso_format passed")
+
+    print("\nAll tests passed!")
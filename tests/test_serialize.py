@@ -0,0 +1,76 @@
+"""Test JSON serialization of results."""
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from cmdsaw.parsing.schema import CmdSawResult, ToolDoc, CommandDoc, ParseDiagnostics, OptionDoc, PositionalDoc, FileFormat
+from cmdsaw.serialize import dumps_bytes, loads_bytes, to_json, write_json
+
+
+def _result():
+    tool = ToolDoc(
+        command="samtools",
+        version="1.19",
+        help_text="Usage: samtools <command> — ünïcode",
+        invocation=["/usr/bin/samtools"],
+        options=[OptionDoc(long="--threads", type="int", default="4", choices=None)],
+        positionals=[PositionalDoc(name="in.bam", index=0, type="path", file_role="input", file_format=FileFormat(extension=".bam"))],
+        subcommands=[CommandDoc(name="view", path="samtools view", help_text="view")],
+        captured_at="2025-11-10T00:00:00Z",
+    )
+    return CmdSawResult(schema_version="1.0", tool=tool, diagnostics=ParseDiagnostics())
+
+
+def test_to_json_matches_stdlib_output():
+    """Test that the fast encoder produces the same document as stdlib json."""
+    result = _result()
+    expected = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
+    assert to_json(result) == expected
+    with patch.dict(os.environ, {"CMDSAW_JSON": "stdlib"}):
+        assert to_json(result) == expected
+
+
+def test_to_json_without_orjson_uses_pydantic_encoder():
+    """Test that the pydantic fallback produces the same document as stdlib json."""
+    result = _result()
+    expected = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, indent=2)
+    with patch("cmdsaw.serialize.orjson", None):
+        assert to_json(result) == expected
+
+
+def test_write_json_roundtrip():
+    """Test that written JSON loads back into an identical result."""
+    result = _result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.json")
+        write_json(path, result)
+        with open(path, encoding="utf-8") as f:
+            loaded = CmdSawResult.model_validate(json.load(f))
+    assert loaded == result
+
+
+def test_dumps_loads_bytes_roundtrip_both_encoders():
+    """Test that cache-style dicts roundtrip identically with orjson and stdlib."""
+    data = {"name": "view", "help_text": "ünïcode", "options": [{"default": None, "is_flag": True}]}
+    fast = dumps_bytes(data)
+    with patch.dict(os.environ, {"CMDSAW_JSON": "stdlib"}):
+        slow = dumps_bytes(data)
+        assert loads_bytes(fast) == data
+    assert loads_bytes(slow) == data
+    assert fast == slow
+
+
+if __name__ == '__main__':
+    test_to_json_matches_stdlib_output()
+    print("✓ test_to_json_matches_stdlib_output passed")
+
+    test_to_json_without_orjson_uses_pydantic_encoder()
+    print("✓ test_to_json_without_orjson_uses_pydantic_encoder passed")
+
+    test_write_json_roundtrip()
+    print("✓ test_write_json_roundtrip passed")
+
+    test_dumps_loads_bytes_roundtrip_both_encoders()
+    print("✓ test_dumps_loads_bytes_roundtrip_both_encoders passed")
+
+    print("\nAll tests passed!")
@@ -0,0 +1,96 @@
+"""Test deterministic parsing of argparse and click generated help text."""
+from cmdsaw.parsing.template_parser import try_template_parse
+
+ARGPARSE_HELP = """usage: tool [-h] [-o FILE] [-t INT] [--mode {fast,slow}] [-v]
+            {view,sort} ... input [extra ...]
+
+positional arguments:
+  {view,sort}
+    view                View records
+    sort                Sort records
+  input                 Input BAM file (.bam)
+  extra                 Extra names
+
+options:
+  -h, --help            show this help message and exit
+  -o FILE, --output FILE
+                        Output file to write (.vcf)
+  -t INT, --threads INT
+                        Number of threads (default: 4)
+  --mode {fast,slow}    Processing mode with a long description that
+                        wraps onto the next line
+  -v, --verbose         Verbose output
+"""
+
+CLICK_HELP = """Usage: tool sort [OPTIONS] INPUT [OUTPUTS]...
+
+  Sort records.
+
+Options:
+  -o, --output PATH   Output file to write.
+  --threads INTEGER   Threads.  [default: 4]
+  --mode [fast|slow]  Mode.
+  --name TEXT         A name.  [required]
+  --verbose           Verbose.
+  --help              Show this message and exit.
+"""
+
+
+def test_argparse_help_is_parsed():
+    """Test options, positionals and subcommands from argparse output."""
+    doc = try_template_parse("tool", ARGPARSE_HELP)
+
+    assert doc is not None
+    assert doc.subcommands == ["view", "sort"]
+    assert doc.requires_subcommand is True
+    opts = {o.long: o for o in doc.options}
+    assert list(opts) == ["--output", "--threads", "--mode", "--verbose"]
+    assert opts["--output"].short == "-o"
+    assert opts["--output"].file_role == "output"
+    assert opts["--output"].file_format.extension == ".vcf"
+    assert opts["--threads"].type == "int"
+    assert opts["--threads"].default == "4"
+    assert opts["--mode"].choices == ["fast", "slow"]
+    assert opts["--mode"].description.endswith("wraps onto the next line")
+    assert opts["--verbose"].is_flag
+    assert [(p.name, p.index, p.required, p.variadic) for p in doc.positionals] == [
+        ("input", 0, True, False),
+        ("extra", 1, False, True),
+    ]
+    assert doc.positionals[0].file_role == "input"
+
+
+def test_click_help_is_parsed():
+    """Test options and usage-line positionals from click output."""
+    doc = try_template_parse("tool sort", CLICK_HELP)
+
+    assert doc is not None
+    assert (doc.name, doc.path, doc.subcommands) == ("sort", "tool sort", [])
+    opts = {o.long: o for o in doc.options}
+    assert "--help" not in opts
+    assert opts["--output"].type == "path"
+    assert opts["--threads"].default == "4"
+    assert opts["--mode"].choices == ["fast", "slow"]
+    assert opts["--name"].required
+    assert [(p.name, p.required, p.variadic) for p in doc.positionals] == [
+        ("input", True, False),
+        ("outputs", False, True),
+    ]
+
+
+def test_unrecognized_help_returns_none():
+    """Test that free-form help text is left to the LLM."""
+    assert try_template_parse("samtools", "Usage: samtools <command> [options]\n\nCommands:\n  view  SAM<->BAM\n") is None
+
+
+if __name__ == '__main__':
+    test_argparse_help_is_parsed()
+    print("✓ test_argparse_help_is_parsed passed")
+
+    test_click_help_is_parsed()
+    print("✓ test_click_help_is_parsed passed")
+
+    test_unrecognized_help_returns_none()
+    print("✓ test_unrecognized_help_returns_none passed")
+
+    print("\nAll tests passed!")
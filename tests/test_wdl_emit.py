@@ -0,0 +1,58 @@
+"""Test WDL file emission."""
+import os
+import tempfile
+from unittest.mock import patch
+from cmdsaw.parsing.schema import CommandDoc
+from cmdsaw.parsing.resource_estimator import ResourceEstimate
+from cmdsaw.wdl import emit_wdl
+
+
+def _docs():
+    return [
+        CommandDoc(name="tool", path="tool", help_text="tool help", requires_subcommand=True),
+        CommandDoc(name="view", path="tool view", help_text="view help"),
+        CommandDoc(name="sort", path="tool sort", help_text="sort help"),
+        CommandDoc(name="view", path="tool-view", help_text="collides with tool view"),
+    ]
+
+
+def _estimates(docs, **kwargs):
+    return [ResourceEstimate(cpu=2, mem_gb=4.0) for _ in docs]
+
+
+def test_emit_wdl_preserves_input_order():
+    """Test that tasks are written in the order their commands were given."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "tool.wdl")
+        with patch("cmdsaw.wdl.estimate_resources_batch", side_effect=_estimates):
+            emit_wdl(tool_name="tool", docs=_docs(), out_path=out, model_name="m", concurrency=4)
+        with open(out, encoding="utf-8") as f:
+            wdl = f.read()
+
+    assert wdl.startswith("version 1.2")
+    # Root requires a subcommand and is skipped
+    assert "task tool {" not in wdl
+    assert wdl.index("task tool_view ") < wdl.index("task tool_sort ") < wdl.index("task tool_view_2 ")
+
+
+def test_emit_wdl_requests_estimates_in_one_batch():
+    """Test that resource estimates for all tasks come from a single batch call."""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "tool.wdl")
+        with patch("cmdsaw.wdl.estimate_resources_batch", side_effect=_estimates) as batch:
+            emit_wdl(tool_name="tool", docs=_docs(), out_path=out, model_name="m", concurrency=3)
+
+    assert batch.call_count == 1
+    (docs,), kwargs = batch.call_args
+    assert [d.path for d in docs] == ["tool view", "tool sort", "tool-view"]
+    assert kwargs["concurrency"] == 3
+
+
+if __name__ == '__main__':
+    test_emit_wdl_preserves_input_order()
+    print("✓ test_emit_wdl_preserves_input_order passed")
+
+    test_emit_wdl_requests_estimates_in_one_batch()
+    print("✓ test_emit_wdl_requests_estimates_in_one_batch passed")
+
+    print("\nAll tests passed!")